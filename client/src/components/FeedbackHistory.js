@@ -53,6 +53,18 @@ const FeedbackHistory = () => {
     }
   };
 
+  // History items are summaries; load story and insights when an entry is opened
+  const handleSelect = async (item) => {
+    setSelectedFeedback(item);
+    try {
+      const response = await feedbackAPI.getFeedback(item.id);
+      setSelectedFeedback((current) => (current?.id === item.id ? response.data : current));
+    } catch (err) {
+      console.error('Error loading feedback:', err);
+      setError('Failed to load feedback details');
+    }
+  };
+
   const handleDeleteClick = (id) => {
     setFeedbackToDelete(id);
     setDeleteDialogOpen(true);
@@ -153,7 +165,7 @@ const FeedbackHistory = () => {
                           bgcolor: 'action.hover',
                         },
                       }}
-                      onClick={() => setSelectedFeedback(item)}
+                      onClick={() => handleSelect(item)}
                     >
                       <Box sx={{ display: 'flex', justifyContent: 'space-between', mb: 1 }}>
                         <Chip
@@ -0,0 +1,160 @@
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+import asyncio
+import logging
+import queue
+import time
+from config import Settings
+
+LOG_FORMAT = "%(asctime)s | %(levelname)s | %(message)s"
+
+logger = logging.getLogger(__name__)
+
+
+def configure_logging(config: Settings) -> Optional[QueueListener]:
+    """Configure root logging; returns the file-writing listener when LOG_FILE is set."""
+    if not config.log_file:
+        logging.basicConfig(
+            level=logging.INFO,
+            format=LOG_FORMAT,
+        )
+        return None
+
+    # Request threads only enqueue records; a background listener owns the file.
+    # SimpleQueue is unbounded and skips Queue's task-tracking locks.
+    log_queue = queue.SimpleQueue()
+    file_handler = logging.FileHandler(config.log_file)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    queue_handler = QueueHandler(log_queue)
+    # QueueHandler merges args into the message; leave layout to the file handler
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
+    return QueueListener(log_queue, file_handler, respect_handler_level=True)
+
+
+class TimingMiddleware:
+    """Pure ASGI request logger; avoids BaseHTTPMiddleware's per-request task group."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter_ns()
+        status_code = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ms = (time.perf_counter_ns() - start) / 1e6
+            logger.info("%s %s -> %s [%.1fms]", scope["method"], scope["path"], status_code, elapsed_ms)
+
+
+def validate_ai_services():
+    """Validate Hugging Face API configuration and warm optional caches; never raises."""
+    # Import Hugging Face service gracefully - don't fail if it has issues
+    try:
+        from services.huggingface_service import validate_huggingface_key, warm_up_semantic_cache
+    except Exception as e:
+        logger.warning("Could not import Hugging Face service: %s. AI features will use fallbacks.", e)
+        return
+
+    try:
+        if validate_huggingface_key():
+            logger.info("Hugging Face API validated successfully")
+        else:
+            logger.warning("Hugging Face API not configured. AI features will use fallbacks.")
+    except Exception as e:
+        logger.warning("Hugging Face API validation failed: %s. AI features will use fallbacks.", e)
+
+    # Off the request path: loading the embedding model can take a few seconds
+    if warm_up_semantic_cache():
+        logger.info("Semantic result cache ready")
+
+
+def create_app(config: Settings) -> FastAPI:
+    """Build the API: logging, schema bootstrap, middleware, routers and lifespan."""
+    # Logging setup (must be early for error handling)
+    log_listener = configure_logging(config)
+
+    # Database setup
+    from database import engine, init_db, check_schema_version
+    from services.sentiment import warm_up as warm_up_sentiment
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        """Bootstrap the schema, warm up sentiment scoring and start background work; close the pool and flush logs on shutdown."""
+        if log_listener:
+            log_listener.start()
+        # Create and migrate tables here in dev. With RUN_DB_BOOTSTRAP=0 (workers behind a
+        # deploy step that runs `python -m migrations`) only the stamped version is checked.
+        if config.run_db_bootstrap:
+            await init_db()
+        else:
+            await check_schema_version()
+        # Parse the sentiment lexicon before the first /analyze instead of during it
+        await asyncio.to_thread(warm_up_sentiment)
+        # Routes are registered by now, so auth stays available even if AI validation fails.
+        # Validation may hit the network: run it in a worker thread without delaying startup.
+        validation_task = asyncio.create_task(asyncio.to_thread(validate_ai_services))
+        yield
+        if not validation_task.done():
+            validation_task.cancel()
+        await engine.dispose()
+        if log_listener:
+            log_listener.stop()
+
+    # Initialize FastAPI app
+    app = FastAPI(
+        title="HackUTD Customer Feedback Dashboard API",
+        version="2.0.0",
+        description="API for analyzing customer feedback with AI-powered insights",
+        lifespan=lifespan,
+        # Skip OpenAPI schema generation and interactive docs in production
+        docs_url=None if config.is_production else "/docs",
+        redoc_url=None,
+        openapi_url=None if config.is_production else "/openapi.json",
+    )
+
+    # ------------------------------------------------
+    # CORS configuration
+    # ------------------------------------------------
+    # CORS_DISABLE=1 drops the middleware when an upstream proxy/ingress enforces CORS
+    if not config.cors_disabled:
+        app.add_middleware(
+            CORSMiddleware,
+            # A set gives O(1) origin checks; Starlette only needs a collection
+            allow_origins=frozenset(config.cors_origins),
+            # The client sends a Bearer token header, never cookies
+            allow_credentials=False,
+            allow_methods=["GET", "POST", "PUT", "DELETE"],
+            allow_headers=["Authorization", "Content-Type"],
+            # Let browsers reuse a preflight result for a day
+            max_age=86400,
+        )
+
+    # Request logging middleware
+    app.add_middleware(TimingMiddleware)
+
+    # ------------------------------------------------
+    # Include routers (imported after logging is configured so import-time
+    # service warnings use the configured handlers)
+    # ------------------------------------------------
+    from routes import auth, feedback, system
+
+    app.include_router(auth.router)
+    app.include_router(feedback.router)
+    app.include_router(system.router)
+
+    return app
@@ -1,15 +1,14 @@
 #!/usr/bin/env python3
 """Script to check if Hugging Face API key is configured correctly."""
-import os
-from pathlib import Path
-from dotenv import load_dotenv
+from config import get_settings, load_env_once
+from utils.keys import is_placeholder_key
 
 # Load .env file
-env_path = Path(__file__).parent / ".env"
-load_dotenv(env_path)
+load_env_once()
 
-api_key = os.getenv("HUGGINGFACE_API_KEY", "").strip()
-force_fallback = os.getenv("HUGGINGFACE_FORCE_FALLBACK", "").strip().lower() in ("1", "true", "yes", "on")
+settings = get_settings()
+api_key = settings.hf_api_key
+force_fallback = settings.hf_force_fallback
 
 print("=" * 60)
 print("Hugging Face API Key Configuration Check")
@@ -24,11 +23,7 @@ if api_key:
     print(f"API Key preview: {api_key[:10]}...{api_key[-4:] if len(api_key) > 14 else ''}")
     
     # Check if it's a placeholder
-    is_placeholder = (
-        api_key.lower() in ["", "placeholder", "your_huggingface_api_key_here"] or
-        len(api_key) < 10 or
-        api_key.startswith("your_")
-    )
+    is_placeholder = is_placeholder_key(api_key)
     
     if is_placeholder:
         print("⚠️  WARNING: API key appears to be a placeholder!")
@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from dotenv import load_dotenv
+import os
+
+ENV_PATH = Path(__file__).resolve().parent / ".env"
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "llm"
+
+DEFAULT_CORS_ORIGINS = ("http://localhost:3000", "http://127.0.0.1:3000")
+TRUTHY_VALUES = ("1", "true", "yes", "on")
+SENTIMENT_BACKENDS = ("vader", "textblob")
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Process-wide configuration parsed once from the environment."""
+    cors_origins: tuple[str, ...]
+    cors_disabled: bool
+    log_file: str
+    database_url: str
+    hf_api_key: str
+    hf_force_fallback: bool
+    hf_model: str
+    hf_semantic_cache: bool
+    hf_max_inflight: int
+    hf_cache_dir: str
+    run_db_bootstrap: bool
+    environment: str
+    sentiment_backend: str
+
+    @property
+    def is_production(self) -> bool:
+        return self.environment in ("prod", "production")
+
+
+@lru_cache(maxsize=1)
+def load_env_once() -> bool:
+    """Load server/.env into the process environment on first call only."""
+    load_dotenv(ENV_PATH if ENV_PATH.exists() else None, override=False)
+    return True
+
+
+def _env_flag(name: str, default: str = "") -> bool:
+    return os.getenv(name, default).strip().lower() in TRUTHY_VALUES
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, ""))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Read and parse all environment configuration exactly once."""
+    load_env_once()
+    cors_origins_env = os.getenv("CORS_ORIGINS", "").strip()
+    cors_origins = tuple(origin.strip() for origin in cors_origins_env.split(",") if origin.strip())
+    sentiment_backend = os.getenv("SENTIMENT_BACKEND", "vader").strip().lower()
+
+    return Settings(
+        cors_origins=cors_origins or DEFAULT_CORS_ORIGINS,
+        cors_disabled=_env_flag("CORS_DISABLE"),
+        log_file=os.getenv("LOG_FILE", ""),
+        database_url=os.getenv("DATABASE_URL", "sqlite:///./feedback.db"),
+        hf_api_key=os.getenv("HUGGINGFACE_API_KEY", "").strip(),
+        hf_force_fallback=_env_flag("HUGGINGFACE_FORCE_FALLBACK"),
+        hf_model=os.getenv("HUGGINGFACE_MODEL", "google/flan-t5-base").strip(),
+        hf_semantic_cache=_env_flag("HUGGINGFACE_SEMANTIC_CACHE"),
+        hf_max_inflight=_env_int("HUGGINGFACE_MAX_INFLIGHT", 8),
+        hf_cache_dir=os.getenv("HUGGINGFACE_CACHE_DIR", "").strip() or str(DEFAULT_CACHE_DIR),
+        run_db_bootstrap=_env_flag("RUN_DB_BOOTSTRAP", "1"),
+        environment=os.getenv("ENV", "development").strip().lower(),
+        sentiment_backend=sentiment_backend if sentiment_backend in SENTIMENT_BACKENDS else "vader",
+    )
@@ -1,40 +1,98 @@
-from sqlalchemy import create_engine, text
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-import os
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from config import get_settings
+from migrations import SCHEMA_VERSION, get_schema_version, run_migrations
 
-# SQLite database URL
-SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./feedback.db")
+# SQLite by default; any backend with an asyncio driver works
+SQLALCHEMY_DATABASE_URL = get_settings().database_url
 
-# Create engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+# asyncio driver used when DATABASE_URL names a backend without a driver (sqlite://).
+# Only backends the migrations' SQL (ON CONFLICT upserts) runs on are listed.
+ASYNC_DRIVERS = {
+    "sqlite": "aiosqlite",
+    "postgresql": "asyncpg",
+}
+
+
+def _async_url(url: str) -> URL:
+    """Point a driverless URL at its backend's asyncio driver; leave explicit drivers alone."""
+    parsed = make_url(url)
+    if "+" in parsed.drivername:
+        return parsed
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(
+            f"DATABASE_URL backend {backend!r} has no default asyncio driver; "
+            f"name one explicitly, e.g. {backend}+<driver>://..."
+        )
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+ASYNC_DATABASE_URL = _async_url(SQLALCHEMY_DATABASE_URL)
+IS_SQLITE = ASYNC_DATABASE_URL.get_backend_name() == "sqlite"
+
+# Per-connection SQLite tuning: WAL lets readers run alongside the writer and,
+# with synchronous=NORMAL, commits no longer fsync the main database file.
+# Reads go through a 256 MB memory map and a 64 MB page cache (negative = KiB).
+SQLITE_PRAGMAS = (
+    "journal_mode=WAL",
+    "synchronous=NORMAL",
+    "temp_store=MEMORY",
+    "cache_size=-64000",
+    "mmap_size=268435456",
 )
 
-# Create SessionLocal class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create engine with a persistent connection pool so requests reuse open
+# SQLite handles instead of reopening the database (and its WAL/SHM files).
+# The async engine lets request handlers await queries on the event loop
+# instead of occupying a threadpool slot each. The busy timeout is an
+# sqlite3 connect argument; other drivers would reject it.
+engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    connect_args={"timeout": 30} if IS_SQLITE else {},
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=5,
+    max_overflow=10,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+)
+
+if IS_SQLITE:
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+        cursor.close()
+
+# Create SessionLocal class; objects stay readable after commit without a reload
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 # Base class for models
 Base = declarative_base()
 
 # Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def ensure_feedback_table_columns():
-    """Ensure optional columns exist on feedback_entries table."""
-    if not SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-        # Rely on migrations for non-SQLite databases
-        return
+async def init_db() -> int:
+    """Create all tables and apply pending migrations; the single schema initializer."""
+    import models  # noqa: F401 - registers tables on Base.metadata
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        return await conn.run_sync(run_migrations)
 
-    with engine.connect() as conn:
-        result = conn.execute(text("PRAGMA table_info(feedback_entries);"))
-        columns = {row[1] for row in result}
-        if "story_metadata" not in columns:
-            conn.execute(text("ALTER TABLE feedback_entries ADD COLUMN story_metadata TEXT;"))
 
+async def check_schema_version():
+    """Fail fast if the database has not been migrated to the version this code expects."""
+    async with engine.connect() as conn:
+        version = await conn.run_sync(get_schema_version)
+    if version < SCHEMA_VERSION:
+        raise RuntimeError(
+            f"Database schema is at version {version}, expected {SCHEMA_VERSION}. "
+            "Run `python -m migrations` from the server directory."
+        )
@@ -0,0 +1,8 @@
+"""Add feedback_entries.story_metadata to databases created before the column existed."""
+from sqlalchemy import inspect, text
+
+
+def upgrade(conn):
+    columns = {column["name"] for column in inspect(conn).get_columns("feedback_entries")}
+    if "story_metadata" not in columns:
+        conn.execute(text("ALTER TABLE feedback_entries ADD COLUMN story_metadata TEXT"))
@@ -0,0 +1,9 @@
+"""Index feedback history lookups by owner and recency."""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_feedback_user_created "
+        "ON feedback_entries (user_id, created_at)"
+    ))
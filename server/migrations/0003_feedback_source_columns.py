@@ -0,0 +1,47 @@
+"""Denormalize story/insights provenance into columns and backfill them from the JSON blobs."""
+import json
+from sqlalchemy import inspect, text
+
+SOURCE_COLUMNS = (
+    "story_source",
+    "story_model",
+    "story_reason",
+    "insights_source",
+    "insights_model",
+    "insights_reason",
+)
+
+
+def _load(raw):
+    try:
+        value = json.loads(raw) if raw else {}
+    except ValueError:
+        return {}
+    return value if isinstance(value, dict) else {}
+
+
+def upgrade(conn):
+    columns = {column["name"] for column in inspect(conn).get_columns("feedback_entries")}
+    for name in SOURCE_COLUMNS:
+        if name not in columns:
+            conn.execute(text(f"ALTER TABLE feedback_entries ADD COLUMN {name} VARCHAR"))
+
+    rows = conn.execute(text(
+        "SELECT id, story_metadata, insights FROM feedback_entries "
+        "WHERE story_metadata IS NOT NULL OR insights IS NOT NULL"
+    )).all()
+    updates = []
+    for row in rows:
+        story, insights = _load(row.story_metadata), _load(row.insights)
+        updates.append({
+            "id": row.id,
+            "story_source": story.get("source"),
+            "story_model": story.get("model"),
+            "story_reason": story.get("reason"),
+            "insights_source": insights.get("source"),
+            "insights_model": insights.get("model"),
+            "insights_reason": insights.get("reason"),
+        })
+    if updates:
+        assignments = ", ".join(f"{name} = :{name}" for name in SOURCE_COLUMNS)
+        conn.execute(text(f"UPDATE feedback_entries SET {assignments} WHERE id = :id"), updates)
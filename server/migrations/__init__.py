@@ -0,0 +1,51 @@
+"""Numbered schema migrations, applied in order and stamped into schema_meta."""
+import importlib
+import logging
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+logger = logging.getLogger(__name__)
+
+# Migration modules in apply order; a fully migrated database reports SCHEMA_VERSION
+MIGRATIONS = (
+    "0001_story_metadata",
+    "0002_feedback_user_created_index",
+    "0003_feedback_source_columns",
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+_CREATE_META_SQL = text(
+    "CREATE TABLE IF NOT EXISTS schema_meta (key VARCHAR PRIMARY KEY, value INTEGER NOT NULL)"
+)
+_READ_VERSION_SQL = text("SELECT value FROM schema_meta WHERE key = 'version'")
+_WRITE_VERSION_SQL = text(
+    "INSERT INTO schema_meta (key, value) VALUES ('version', :version) "
+    "ON CONFLICT (key) DO UPDATE SET value = excluded.value"
+)
+
+
+def get_schema_version(conn) -> int:
+    """Return the stamped schema version, or 0 if the database was never migrated."""
+    try:
+        return conn.execute(_READ_VERSION_SQL).scalar() or 0
+    except DBAPIError:
+        # schema_meta does not exist yet
+        conn.rollback()
+        return 0
+
+
+def run_migrations(conn) -> int:
+    """Apply every pending migration on an open transaction and return the new version.
+
+    Takes a sync Connection so it can run under AsyncConnection.run_sync.
+    """
+    conn.execute(_CREATE_META_SQL)
+    current = get_schema_version(conn)
+    for version, name in enumerate(MIGRATIONS, start=1):
+        if version <= current:
+            continue
+        module = importlib.import_module(f"{__name__}.{name}")
+        module.upgrade(conn)
+        conn.execute(_WRITE_VERSION_SQL, {"version": version})
+        logger.info("Applied migration %s", name)
+    return SCHEMA_VERSION
@@ -0,0 +1,12 @@
+"""Bootstrap and migrate the database: run from server/ with `python -m migrations`."""
+import asyncio
+import logging
+from config import load_env_once
+
+load_env_once()
+logging.basicConfig(level=logging.INFO, format="%(asctime)s | %(levelname)s | %(message)s")
+
+from database import init_db
+
+version = asyncio.run(init_db())
+logging.getLogger(__name__).info("Database schema is at version %s", version)
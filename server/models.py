@@ -1,10 +1,12 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
 
 class User(Base):
     __tablename__ = "users"
+    # Fetch server defaults (created_at) via INSERT ... RETURNING instead of a refresh query
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -18,6 +20,9 @@ class User(Base):
 
 class FeedbackEntry(Base):
     __tablename__ = "feedback_entries"
+    # History pages filter by user_id and sort by created_at straight off this index
+    __table_args__ = (Index("ix_feedback_user_created", "user_id", "created_at"),)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -25,8 +30,15 @@ class FeedbackEntry(Base):
     sentiment = Column(Float, nullable=True)
     sentiment_label = Column(String, nullable=True)
     user_story = Column(Text, nullable=True)
-    story_metadata = Column(Text, nullable=True)
+    story_metadata = Column(Text, nullable=True)  # legacy JSON blob; superseded by story_* columns
     insights = Column(Text, nullable=True)  # JSON string
+    # Provenance stored as plain columns so reads never parse JSON for it
+    story_source = Column(String, nullable=True)
+    story_model = Column(String, nullable=True)
+    story_reason = Column(String, nullable=True)
+    insights_source = Column(String, nullable=True)
+    insights_model = Column(String, nullable=True)
+    insights_reason = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationship to user
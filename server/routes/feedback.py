@@ -1,69 +1,182 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import bindparam, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from database import get_db
 from models import User, FeedbackEntry
-from schemas import FeedbackCreate, FeedbackResponse, SentimentResponse, StoryResponse, InsightsResponse
+from schemas import FeedbackCreate, FeedbackBatchCreate, FeedbackResponse, FeedbackSummary, SentimentResponse, StoryResponse, InsightsResponse
 from auth import get_current_user
-from services.sentiment import analyze_sentiment
-from services.huggingface_service import generate_story_with_retry, generate_insights_with_retry
-import json
+from services.sentiment import analyze_sentiment, analyze_sentiment_batch
+from services.huggingface_service import (
+    generate_story_async,
+    generate_insights_async,
+    generate_stories_batch_async,
+    generate_insights_batch_async,
+)
+import asyncio
+import orjson
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/feedback", tags=["feedback"])
 
+# Upper bound on history page size so one request never materializes the whole table
+MAX_HISTORY_LIMIT = 500
+
+# Columns a history list item needs; the large story/insights blobs stay in the
+# table until the client opens an entry via GET /feedback/{id}
+HISTORY_COLUMNS = (
+    FeedbackEntry.id,
+    FeedbackEntry.text,
+    FeedbackEntry.sentiment,
+    FeedbackEntry.sentiment_label,
+    FeedbackEntry.created_at,
+)
+
+# Statements built once at import; call sites only bind parameters
+_HISTORY_PAGE = (
+    select(*HISTORY_COLUMNS)
+    .where(FeedbackEntry.user_id == bindparam("user_id"))
+    .order_by(FeedbackEntry.created_at.desc())
+    .offset(bindparam("skip"))
+    .limit(bindparam("limit"))
+)
+_DELETE_OWNED_ENTRY = delete(FeedbackEntry).where(
+    FeedbackEntry.id == bindparam("feedback_id"),
+    FeedbackEntry.user_id == bindparam("user_id"),
+)
+
+def _source_columns(story_result: dict, insights_result: dict) -> dict:
+    """Provenance fields written alongside an entry, read back without JSON parsing."""
+    return {
+        "story_source": story_result.get("source"),
+        "story_model": story_result.get("model"),
+        "story_reason": story_result.get("reason"),
+        "insights_source": insights_result.get("source"),
+        "insights_model": insights_result.get("model"),
+        "insights_reason": insights_result.get("reason"),
+    }
+
+def _parse_insights(raw) -> dict:
+    if not raw:
+        return {}
+    try:
+        return orjson.loads(raw) if isinstance(raw, str) else raw
+    except orjson.JSONDecodeError:
+        return {}
+
+def _to_response(entry, insights: dict) -> FeedbackResponse:
+    """Build the full API shape from a stored entry."""
+    return FeedbackResponse(
+        id=entry.id,
+        text=entry.text,
+        sentiment=entry.sentiment,
+        sentiment_label=entry.sentiment_label,
+        user_story=entry.user_story,
+        insights=insights,
+        story_source=entry.story_source,
+        story_model=entry.story_model,
+        story_reason=entry.story_reason,
+        insights_source=entry.insights_source,
+        insights_model=entry.insights_model,
+        insights_reason=entry.insights_reason,
+        created_at=entry.created_at
+    )
+
+async def _get_owned_entry(db: AsyncSession, feedback_id: int, user: User) -> FeedbackEntry:
+    """Primary-key fetch plus ownership check; 404 either way so ids don't leak."""
+    entry = await db.get(FeedbackEntry, feedback_id)
+    if entry is None or entry.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Feedback not found"
+        )
+    return entry
+
+async def _analyze_all(text: str):
+    """Run sentiment, story and insights together; latency is the slowest, not the sum."""
+    return await asyncio.gather(
+        asyncio.to_thread(analyze_sentiment, text),
+        generate_story_async(text),
+        generate_insights_async(text),
+    )
+
 @router.post("/analyze", response_model=SentimentResponse)
-def analyze_feedback(
+async def analyze_feedback(
     feedback: FeedbackCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """Analyze sentiment of feedback."""
-    result = analyze_sentiment(feedback.text)
-    logger.info(f"Sentiment analyzed for user {current_user.username}: {result['label']}")
-    return result
+    # Sentiment scoring is CPU-bound; run it in a worker thread, off the event loop
+    result = await asyncio.to_thread(analyze_sentiment, feedback.text)
+    logger.info("Sentiment analyzed for user %s: %s", current_user.username, result['label'])
+    return SentimentResponse(**result)
+
+@router.post("/analyze/batch", response_model=List[SentimentResponse])
+async def analyze_feedback_batch(
+    batch: FeedbackBatchCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """Analyze sentiment of many feedback texts in one request, in input order."""
+    # One worker-thread hop for the whole batch instead of one per text
+    results = await asyncio.to_thread(analyze_sentiment_batch, batch.texts)
+    logger.info("Sentiment analyzed for user %s: batch of %s", current_user.username, len(results))
+    return [SentimentResponse(**result) for result in results]
 
 @router.post("/generate-story", response_model=StoryResponse)
-def generate_story(
+async def generate_story(
     feedback: FeedbackCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """Generate user story from feedback."""
-    result = generate_story_with_retry(feedback.text)
-    logger.info(f"Story generated for user {current_user.username} (source: {result['source']})")
+    # Model calls and retry waits are awaited, so the loop serves other requests meanwhile
+    result = await generate_story_async(feedback.text)
+    logger.info("Story generated for user %s (source: %s)", current_user.username, result['source'])
     return result
 
+@router.post("/generate-story/batch", response_model=List[StoryResponse])
+async def generate_story_batch(
+    batch: FeedbackBatchCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """Generate user stories for many feedback texts in one request, in input order."""
+    # Texts are numbered several per model call and the reply is split back per item
+    results = await generate_stories_batch_async(batch.texts)
+    logger.info("Stories generated for user %s: batch of %s", current_user.username, len(results))
+    return results
+
 @router.post("/insights", response_model=InsightsResponse)
-def get_insights(
+async def get_insights(
     feedback: FeedbackCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: User = Depends(get_current_user)
 ):
     """Get AI-generated insights from feedback."""
-    result = generate_insights_with_retry(feedback.text)
-    logger.info(f"Insights generated for user {current_user.username} (source: {result.get('source', 'unknown')})")
+    result = await generate_insights_async(feedback.text)
+    logger.info("Insights generated for user %s (source: %s)", current_user.username, result.get('source', 'unknown'))
     return result
 
+@router.post("/insights/batch", response_model=List[InsightsResponse])
+async def get_insights_batch(
+    batch: FeedbackBatchCreate,
+    current_user: User = Depends(get_current_user)
+):
+    """Get AI-generated insights for many feedback texts in one request, in input order."""
+    # Texts are packed several per model call, so the static instructions are sent once per chunk
+    results = await generate_insights_batch_async(batch.texts)
+    logger.info("Insights generated for user %s: batch of %s", current_user.username, len(results))
+    return results
+
 @router.post("/submit", response_model=FeedbackResponse, status_code=status.HTTP_201_CREATED)
-def submit_feedback(
+async def submit_feedback(
     feedback: FeedbackCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Submit feedback and get complete analysis (sentiment, story, insights)."""
-    # Analyze sentiment
-    sentiment_result = analyze_sentiment(feedback.text)
-    
-    # Generate story
-    story_result = generate_story_with_retry(feedback.text)
-    logger.info(f"Story generated for user {current_user.username} (source: {story_result.get('source', 'unknown')})")
-    
-    # Generate insights
-    insights_result = generate_insights_with_retry(feedback.text)
-    logger.info(f"Insights generated for user {current_user.username} (source: {insights_result.get('source', 'unknown')})")
+    sentiment_result, story_result, insights_result = await _analyze_all(feedback.text)
+    logger.info("Story generated for user %s (source: %s)", current_user.username, story_result.get('source', 'unknown'))
+    logger.info("Insights generated for user %s (source: %s)", current_user.username, insights_result.get('source', 'unknown'))
     
     # Save to database
     db_entry = FeedbackEntry(
@@ -72,199 +185,94 @@ def submit_feedback(
         sentiment=sentiment_result["sentiment"],
         sentiment_label=sentiment_result["label"],
         user_story=story_result["story"],
-        story_metadata=json.dumps(story_result),
-        insights=json.dumps(insights_result)
+        insights=orjson.dumps(insights_result).decode(),
+        **_source_columns(story_result, insights_result)
     )
     db.add(db_entry)
-    db.commit()
-    db.refresh(db_entry)
+    await db.commit()
     
-    logger.info(f"Feedback submitted by user {current_user.username} (ID: {db_entry.id})")
+    logger.info("Feedback submitted by user %s (ID: %s)", current_user.username, db_entry.id)
     
     # Return response with structured data
-    return FeedbackResponse(
-        id=db_entry.id,
-        text=db_entry.text,
-        sentiment=db_entry.sentiment,
-        sentiment_label=db_entry.sentiment_label,
-        user_story=db_entry.user_story,
-        insights=insights_result,  # Already a dict, no need to parse
-        story_source=story_result.get("source"),
-        story_model=story_result.get("model"),
-        story_reason=story_result.get("reason"),
-        insights_source=insights_result.get("source") if isinstance(insights_result, dict) else None,
-        insights_model=insights_result.get("model") if isinstance(insights_result, dict) else None,
-        insights_reason=insights_result.get("reason") if isinstance(insights_result, dict) else None,
-        created_at=db_entry.created_at
-    )
+    return _to_response(db_entry, insights_result)  # insights already a dict, no need to parse
 
-@router.get("/history", response_model=List[FeedbackResponse])
-def get_feedback_history(
+@router.get("/history", response_model=List[FeedbackSummary])
+async def get_feedback_history(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-    skip: int = 0,
-    limit: int = 100
+    db: AsyncSession = Depends(get_db),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_HISTORY_LIMIT)
 ):
-    """Get user's feedback history."""
-    entries = db.query(FeedbackEntry)\
-        .filter(FeedbackEntry.user_id == current_user.id)\
-        .order_by(FeedbackEntry.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    """Get user's feedback history, newest first, one page at a time."""
+    # Plain column rows: no ORM identity-map bookkeeping for read-only pages
+    entries = (await db.execute(
+        _HISTORY_PAGE, {"user_id": current_user.id, "skip": skip, "limit": limit}
+    )).all()
     
-    result = []
-    for entry in entries:
-        story_meta = {}
-        if entry.story_metadata:
-            try:
-                story_meta = json.loads(entry.story_metadata)
-            except json.JSONDecodeError:
-                story_meta = {}
-        insights_dict = {}
-        if entry.insights:
-            try:
-                insights_dict = json.loads(entry.insights) if isinstance(entry.insights, str) else entry.insights
-            except json.JSONDecodeError:
-                insights_dict = {}
-        
-        result.append(FeedbackResponse(
+    return [
+        FeedbackSummary(
             id=entry.id,
             text=entry.text,
             sentiment=entry.sentiment,
             sentiment_label=entry.sentiment_label,
-            user_story=entry.user_story,
-            insights=insights_dict,
-            story_source=story_meta.get("source"),
-            story_model=story_meta.get("model"),
-            story_reason=story_meta.get("reason"),
-            insights_source=insights_dict.get("source") if isinstance(insights_dict, dict) else None,
-            insights_model=insights_dict.get("model") if isinstance(insights_dict, dict) else None,
-            insights_reason=insights_dict.get("reason") if isinstance(insights_dict, dict) else None,
             created_at=entry.created_at
-        ))
-    
-    return result
+        )
+        for entry in entries
+    ]
 
 @router.get("/{feedback_id}", response_model=FeedbackResponse)
-def get_feedback(
+async def get_feedback(
     feedback_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific feedback entry."""
-    entry = db.query(FeedbackEntry)\
-        .filter(FeedbackEntry.id == feedback_id)\
-        .filter(FeedbackEntry.user_id == current_user.id)\
-        .first()
-    
-    if not entry:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Feedback not found"
-        )
-    
-    insights_dict = {}
-    if entry.insights:
-        try:
-            insights_dict = json.loads(entry.insights) if isinstance(entry.insights, str) else entry.insights
-        except json.JSONDecodeError:
-            insights_dict = {}
-    story_meta = {}
-    if entry.story_metadata:
-        try:
-            story_meta = json.loads(entry.story_metadata)
-        except json.JSONDecodeError:
-            story_meta = {}
-    
-    return FeedbackResponse(
-        id=entry.id,
-        text=entry.text,
-        sentiment=entry.sentiment,
-        sentiment_label=entry.sentiment_label,
-        user_story=entry.user_story,
-        insights=insights_dict,
-        story_source=story_meta.get("source"),
-        story_model=story_meta.get("model"),
-        story_reason=story_meta.get("reason"),
-        insights_source=insights_dict.get("source") if isinstance(insights_dict, dict) else None,
-        insights_model=insights_dict.get("model") if isinstance(insights_dict, dict) else None,
-        insights_reason=insights_dict.get("reason") if isinstance(insights_dict, dict) else None,
-        created_at=entry.created_at
-    )
+    entry = await _get_owned_entry(db, feedback_id, current_user)
+    return _to_response(entry, _parse_insights(entry.insights))
 
 @router.delete("/{feedback_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_feedback(
+async def delete_feedback(
     feedback_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a feedback entry."""
-    entry = db.query(FeedbackEntry)\
-        .filter(FeedbackEntry.id == feedback_id)\
-        .filter(FeedbackEntry.user_id == current_user.id)\
-        .first()
-    
-    if not entry:
+    # One DELETE with the ownership predicate; no row fetch before deleting
+    result = await db.execute(
+        _DELETE_OWNED_ENTRY, {"feedback_id": feedback_id, "user_id": current_user.id}
+    )
+    await db.commit()
+    if not result.rowcount:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Feedback not found"
         )
-    
-    db.delete(entry)
-    db.commit()
-    logger.info(f"Feedback {feedback_id} deleted by user {current_user.username}")
+    logger.info("Feedback %s deleted by user %s", feedback_id, current_user.username)
     return None
 
 
 @router.put("/{feedback_id}", response_model=FeedbackResponse)
-def update_feedback(
+async def update_feedback(
     feedback_id: int,
     feedback: FeedbackCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update feedback text and regenerate analysis."""
-    entry = db.query(FeedbackEntry)\
-        .filter(FeedbackEntry.id == feedback_id)\
-        .filter(FeedbackEntry.user_id == current_user.id)\
-        .first()
-
-    if not entry:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Feedback not found"
-        )
+    entry = await _get_owned_entry(db, feedback_id, current_user)
 
     # Re-analyze content
-    sentiment_result = analyze_sentiment(feedback.text)
-    story_result = generate_story_with_retry(feedback.text)
-    insights_result = generate_insights_with_retry(feedback.text)
+    sentiment_result, story_result, insights_result = await _analyze_all(feedback.text)
 
     entry.text = feedback.text
     entry.sentiment = sentiment_result["sentiment"]
     entry.sentiment_label = sentiment_result["label"]
     entry.user_story = story_result["story"]
-    entry.story_metadata = json.dumps(story_result)
-    entry.insights = json.dumps(insights_result)
-    db.commit()
-    db.refresh(entry)
-
-    logger.info(f"Feedback {feedback_id} updated by user {current_user.username}")
+    entry.insights = orjson.dumps(insights_result).decode()
+    for column, value in _source_columns(story_result, insights_result).items():
+        setattr(entry, column, value)
+    await db.commit()
 
-    return FeedbackResponse(
-        id=entry.id,
-        text=entry.text,
-        sentiment=entry.sentiment,
-        sentiment_label=entry.sentiment_label,
-        user_story=entry.user_story,
-        insights=insights_result,
-        story_source=story_result.get("source"),
-        story_model=story_result.get("model"),
-        story_reason=story_result.get("reason"),
-        insights_source=insights_result.get("source") if isinstance(insights_result, dict) else None,
-        insights_model=insights_result.get("model") if isinstance(insights_result, dict) else None,
-        insights_reason=insights_result.get("reason") if isinstance(insights_result, dict) else None,
-        created_at=entry.created_at
-    )
+    logger.info("Feedback %s updated by user %s", feedback_id, current_user.username)
 
+    return _to_response(entry, insights_result)
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Request, Response
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional
+import orjson
+import time
+
+router = APIRouter(tags=["system"])
+
+# These routes have no response_model, so they return pre-encoded orjson bytes.
+# Both are async: nothing here blocks, so they skip the threadpool hop.
+
+@lru_cache(maxsize=None)
+def _root_body(docs_url: Optional[str]) -> bytes:
+    """Encode the constant root payload once per app configuration."""
+    return orjson.dumps({
+        "status": "ok",
+        "message": "HackUTD Customer Feedback Dashboard API is running",
+        "version": "2.0.0",
+        "docs": docs_url
+    })
+
+# ------------------------------------------------
+# Root route
+# ------------------------------------------------
+@router.get("/")
+async def root(request: Request):
+    """Root endpoint to check API status."""
+    return Response(content=_root_body(request.app.docs_url), media_type="application/json")
+
+# ------------------------------------------------
+# Health check
+# ------------------------------------------------
+# (epoch second, encoded body); rebuilt at most once per wall-clock second
+_health_cache = (0, b"")
+
+@router.get("/health")
+async def health_check():
+    """Health check endpoint."""
+    global _health_cache
+    now = int(time.time())
+    if now != _health_cache[0]:
+        timestamp = datetime.fromtimestamp(now, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+        _health_cache = (now, orjson.dumps({"status": "healthy", "timestamp": timestamp}))
+    return Response(content=_health_cache[1], media_type="application/json")
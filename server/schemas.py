@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
@@ -18,8 +18,7 @@ class UserResponse(BaseModel):
     email: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 # Token schemas
 class Token(BaseModel):
@@ -30,6 +29,18 @@ class Token(BaseModel):
 class FeedbackCreate(BaseModel):
     text: str
 
+class FeedbackBatchCreate(BaseModel):
+    # Bounded so one request can't tie up a worker thread indefinitely
+    texts: List[str] = Field(min_length=1, max_length=500)
+
+class FeedbackSummary(BaseModel):
+    """History list item; story and insights come from the detail endpoint."""
+    id: int
+    text: str
+    sentiment: Optional[float]
+    sentiment_label: Optional[str]
+    created_at: datetime
+
 class FeedbackResponse(BaseModel):
     id: int
     text: str
@@ -45,10 +56,12 @@ class FeedbackResponse(BaseModel):
     insights_reason: Optional[str] = None
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 class SentimentResponse(BaseModel):
+    # Immutable result built once per request and handed straight to the serializer
+    model_config = ConfigDict(frozen=True)
+
     sentiment: float
     label: str
 
@@ -1,100 +1,345 @@
+import asyncio
+import hashlib
+import importlib
+import importlib.util
 import os
 import json
+import random
 import re
 import logging
-from typing import Dict, Any, Optional
-from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime, timezone
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+import threading
 import time
-from dotenv import load_dotenv
-from pathlib import Path
+import orjson
+from config import get_settings, load_env_once
+from utils.keys import is_placeholder_key
 
-# Try to import huggingface_hub (recommended) and requests (fallback)
-try:
-    from huggingface_hub import InferenceClient
-    HF_HUB_AVAILABLE = True
-except ImportError:
-    HF_HUB_AVAILABLE = False
+# huggingface_hub (recommended) takes hundreds of ms to import; only check it is
+# installed here and import it when the first client is built (never, with
+# HUGGINGFACE_FORCE_FALLBACK=1)
+HF_HUB_AVAILABLE = importlib.util.find_spec("huggingface_hub") is not None
 
 # Always try to import requests as fallback (even if huggingface_hub is available)
 try:
     import requests
+    from requests.adapters import HTTPAdapter
     REQUESTS_AVAILABLE = True
 except ImportError:
     REQUESTS_AVAILABLE = False
 
+# POSIX advisory locks let one worker at a time run the startup probe
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Optional on-disk tier for the result cache, shared by workers and restarts
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+# Optional embedding model for the near-duplicate result cache. Importing it
+# pulls in torch, so numpy and sentence_transformers load in _get_embedder.
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+np = None
+
+# One pooled session for every raw HTTP call so retries and endpoint fallbacks
+# reuse kept-alive TLS connections. A valid API key is set once as a session
+# header (see _apply_session_auth); keyless calls pass _NO_AUTH to drop it.
+_HTTP = None
+if REQUESTS_AVAILABLE:
+    _HTTP = requests.Session()
+    _HTTP.headers.update({"User-Agent": "hackutd25/1.0"})
+
 if not HF_HUB_AVAILABLE and not REQUESTS_AVAILABLE:
     logging.warning("Neither huggingface_hub nor requests available. Hugging Face API features will be disabled.")
 
-# Load environment variables (try local server/.env first, fallback to defaults)
-dotenv_path = Path(__file__).resolve().parent.parent / ".env"
-load_dotenv(dotenv_path if dotenv_path.exists() else None)
+# Load environment variables (no-op if an entry point already loaded server/.env)
+load_env_once()
 
 logger = logging.getLogger(__name__)
 
 # Flags & configuration
-HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "").strip()
-FORCE_FALLBACK = os.getenv("HUGGINGFACE_FORCE_FALLBACK", "").strip().lower() in ("1", "true", "yes", "on")
+settings = get_settings()
+HUGGINGFACE_API_KEY = settings.hf_api_key
+# (key, has_valid_key), fixed for the life of the process; a new key needs a restart
+_KEY_STATE = (HUGGINGFACE_API_KEY, not is_placeholder_key(HUGGINGFACE_API_KEY))
+_NO_AUTH = {"Authorization": None}  # requests omits session headers overridden with None
+
+def _apply_session_auth() -> None:
+    if _HTTP is None:
+        return
+    api_key, has_valid_key = _KEY_STATE
+    if has_valid_key:
+        _HTTP.headers["Authorization"] = f"Bearer {api_key}"
+    else:
+        _HTTP.headers.pop("Authorization", None)
+
+_apply_session_auth()
+FORCE_FALLBACK = settings.hf_force_fallback
+SEMANTIC_CACHE_ENABLED = settings.hf_semantic_cache and SENTENCE_TRANSFORMERS_AVAILABLE
 # Default model - google/flan-t5-base works for basic text generation
 # For better results, consider using a model that requires an API key
 # You can change this via HUGGINGFACE_MODEL env var
 # Use a model that supports text-generation
 # Mistral models require chat API, so we use google/flan-t5-base as default
 # You can change this via HUGGINGFACE_MODEL env var
-HF_MODEL = os.getenv("HUGGINGFACE_MODEL", "google/flan-t5-base").strip()
+HF_MODEL = settings.hf_model
+# Tried on the InferenceClient path when HF_MODEL can't serve text generation
+FALLBACK_MODEL = "google/flan-t5-base"
+# Model calls allowed in flight at once (HUGGINGFACE_MAX_INFLIGHT), to stay
+# inside HF rate limits. Hub calls and raw-HTTP posts share the per-loop limit;
+# the blocking posts run on their own pool so a burst never ties up the default
+# executor that password hashing, sentiment scoring and cache I/O rely on.
+MAX_INFLIGHT = settings.hf_max_inflight
+ASYNC_MAX_CONCURRENCY = MAX_INFLIGHT
+_HTTP_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_INFLIGHT, thread_name_prefix="hf-http")
+if _HTTP is not None:
+    # Requests target two hosts; each host pool keeps a connection per gated caller
+    # plus headroom for the ungated startup check, so none is dropped after use.
+    # Retries stay in our own loop (max_retries=0).
+    _HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=MAX_INFLIGHT + 4, max_retries=0))
+# Upper bound on a single retry wait, before jitter
+MAX_BACKOFF_SECONDS = 30
 
-# Initialize Hugging Face client
-is_available = False
-client = None
+# Successful model responses per unique feedback text; fallbacks are never cached
+# so a recovered API is used again on the next request
+RESULT_CACHE_SIZE = 1024
+# Bump when the story or insights prompt changes so stale results are not served
+PROMPT_VERSION = 2
+# Near-duplicate lookup (HUGGINGFACE_SEMANTIC_CACHE=1, needs sentence-transformers)
+SEMANTIC_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+SEMANTIC_THRESHOLD = 0.92
+SEMANTIC_MIN_ENTRIES = 8
 
-if not HF_HUB_AVAILABLE and not REQUESTS_AVAILABLE:
-    logger.warning("Neither huggingface_hub nor requests available. Hugging Face API features disabled.")
-    is_available = False
-elif FORCE_FALLBACK:
-    logger.warning("HUGGINGFACE_FORCE_FALLBACK is enabled. AI endpoints will use fallback data only.")
-    is_available = False
-else:
-    # Hugging Face Inference API can work without a key for public models
-    # but having a key provides higher rate limits
-    is_available = True
-    if HF_HUB_AVAILABLE:
-        # Use huggingface_hub library (recommended)
+# Successful results also persist in HUGGINGFACE_CACHE_DIR when diskcache is installed
+RESULT_CACHE_TTL = 86400
+
+_embedder = None
+_embedder_lock = threading.Lock()
+_disk_cache = None
+_disk_cache_lock = threading.Lock()
+
+
+def _get_disk_cache():
+    """Open the diskcache store on first use; None when diskcache is unavailable."""
+    global _disk_cache, DISKCACHE_AVAILABLE
+    if not DISKCACHE_AVAILABLE:
+        return None
+    with _disk_cache_lock:
+        if _disk_cache is None:
+            try:
+                _disk_cache = diskcache.Cache(settings.hf_cache_dir)
+            except Exception as e:
+                logger.warning("Disk result cache disabled, could not open %s: %s", settings.hf_cache_dir, e)
+                DISKCACHE_AVAILABLE = False
+                return None
+    return _disk_cache
+
+
+def _get_embedder():
+    """Load the MiniLM embedder on first use; None when the semantic tier is off."""
+    global _embedder, np, SEMANTIC_CACHE_ENABLED
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+    with _embedder_lock:
+        if _embedder is None:
+            try:
+                import numpy as np
+                from sentence_transformers import SentenceTransformer
+                _embedder = SentenceTransformer(SEMANTIC_MODEL)
+            except Exception as e:
+                logger.warning("Semantic cache disabled, could not load %s: %s", SEMANTIC_MODEL, e)
+                SEMANTIC_CACHE_ENABLED = False
+                return None
+    return _embedder
+
+
+def warm_up_semantic_cache() -> bool:
+    """Load the embedder ahead of the first request; False when the tier is off."""
+    return _get_embedder() is not None
+
+
+def _embed(text: str):
+    embedder = _get_embedder()
+    if embedder is None:
+        return None
+    return np.asarray(embedder.encode(text, normalize_embeddings=True), dtype=np.float32)
+
+
+def _cache_key(kind: str, feedback_text: str) -> str:
+    payload = orjson.dumps({"v": PROMPT_VERSION, "fn": kind, "model": HF_MODEL, "text": feedback_text})
+    return hashlib.sha256(payload).hexdigest()
+
+
+class _ResultCache:
+    """Small thread-safe LRU map; requests call the service from worker threads.
+
+    Keys are exact-text hashes, also looked up in the disk tier on a memory miss.
+    When the semantic tier is enabled each entry also keeps a normalized
+    embedding, and an exact miss falls back to the closest cached text if its
+    cosine similarity clears SEMANTIC_THRESHOLD.
+    """
+
+    def __init__(self, kind: str, maxsize: int):
+        self.kind = kind
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._vectors: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, feedback_text: str) -> Optional[Dict[str, Any]]:
+        key = _cache_key(self.kind, feedback_text)
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+                return value
+        value = self._disk_get(key)
+        if value is not None:
+            self._remember(key, value, None)
+            return value
+        with self._lock:
+            if len(self._vectors) < SEMANTIC_MIN_ENTRIES:
+                return None
+        query = _embed(feedback_text)
+        if query is None:
+            return None
+        with self._lock:
+            keys = list(self._vectors)
+            if len(keys) < SEMANTIC_MIN_ENTRIES:
+                return None
+            scores = np.stack([self._vectors[k] for k in keys]) @ query
+            best = int(scores.argmax())
+            if scores[best] < SEMANTIC_THRESHOLD:
+                return None
+            self._data.move_to_end(keys[best])
+            return self._data[keys[best]]
+
+    def put(self, feedback_text: str, value: Dict[str, Any]) -> None:
+        key = _cache_key(self.kind, feedback_text)
+        self._remember(key, value, _embed(feedback_text))
+        disk = _get_disk_cache()
+        if disk is not None:
+            try:
+                disk.set(key, orjson.dumps(value), expire=RESULT_CACHE_TTL)
+            except Exception as e:
+                logger.debug("Disk result cache write failed: %s", e)
+
+    def _disk_get(self, key: str) -> Optional[Dict[str, Any]]:
+        disk = _get_disk_cache()
+        if disk is None:
+            return None
         try:
-            # Check if we have a valid API key (not placeholder)
-            has_valid_key = (
-                HUGGINGFACE_API_KEY and 
-                HUGGINGFACE_API_KEY not in ["", "placeholder", "your_huggingface_api_key_here"] and
-                len(HUGGINGFACE_API_KEY) > 10 and
-                not HUGGINGFACE_API_KEY.startswith("your_")
-            )
-            
-            if has_valid_key:
-                client = InferenceClient(token=HUGGINGFACE_API_KEY)
-                logger.info(f"Hugging Face InferenceClient initialized with API key (key length: {len(HUGGINGFACE_API_KEY)})")
-            else:
-                client = InferenceClient()  # Works without key for public models
-                logger.info("Hugging Face InferenceClient initialized without API key (using public models, may have rate limits)")
+            raw = disk.get(key)
+            return orjson.loads(raw) if raw is not None else None
         except Exception as e:
-            logger.warning(f"Failed to initialize Hugging Face InferenceClient: {e}")
-            client = None
-            is_available = False
-    elif REQUESTS_AVAILABLE:
-        # Fallback to requests library
-        if HUGGINGFACE_API_KEY and HUGGINGFACE_API_KEY not in ["", "placeholder", "your_huggingface_api_key_here"]:
-            logger.info("Using requests library with Hugging Face API key.")
-        else:
-            logger.info("Using requests library without API key (may have rate limits).")
+            logger.debug("Disk result cache read failed: %s", e)
+            return None
+
+    def _remember(self, key: str, value: Dict[str, Any], vector) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if vector is not None:
+                self._vectors[key] = vector
+            if len(self._data) > self.maxsize:
+                evicted, _ = self._data.popitem(last=False)
+                self._vectors.pop(evicted, None)
+
+
+_story_cache = _ResultCache("story", RESULT_CACHE_SIZE)
+_insights_cache = _ResultCache("insights", RESULT_CACHE_SIZE)
+
+# Hugging Face client, built on first use by _get_async_client so importing
+# this module does no client setup
+_async_client = None
+_async_semaphore = None  # (event loop, Semaphore)
+
+# Whether model calls are attempted at all: fixed at import, since the libraries
+# and HUGGINGFACE_FORCE_FALLBACK cannot change afterwards. True even if client
+# initialization had issues, so calls still get their retry attempts.
+_AVAILABLE = (HF_HUB_AVAILABLE or REQUESTS_AVAILABLE) and not FORCE_FALLBACK
 
 def is_huggingface_available() -> bool:
     """Check if Hugging Face API is available. Returns True if we can attempt API calls."""
-    # Don't block if FORCE_FALLBACK is set
-    if FORCE_FALLBACK:
+    return _AVAILABLE
+
+# Workers share the raw-HTTP startup probe through a sentinel file in
+# HUGGINGFACE_CACHE_DIR, named per key and model; a fresh one skips the probe
+VALIDATION_TTL = 3600
+
+def _validation_sentinel() -> str:
+    fingerprint = hashlib.sha256(f"{_KEY_STATE[0]}\0{HF_MODEL}".encode()).hexdigest()[:16]
+    return os.path.join(settings.hf_cache_dir, f"validated-{fingerprint}")
+
+def _recently_validated(sentinel: str) -> bool:
+    try:
+        return time.time() - os.path.getmtime(sentinel) < VALIDATION_TTL
+    except OSError:
         return False
-    # Return True if we have the libraries, even if client initialization had issues
-    # This allows retry attempts
-    return (HF_HUB_AVAILABLE or REQUESTS_AVAILABLE)
 
+def _probe_requests_api(sentinel: Optional[str]) -> bool:
+    """POST a test input; a 200 touches the sentinel. Always allows attempts."""
+    # Fallback to requests (old method); the session carries any API key
+    # Use the correct endpoint format
+    test_url = f"https://router.huggingface.co/hf-inference/models/{HF_MODEL}"
+
+    response = _HTTP.post(
+        test_url,
+        json={"inputs": "test"},
+        timeout=5
+    )
+    
+    if response.status_code == 200:
+        logger.info("Hugging Face API validated successfully (using requests)")
+        if sentinel:
+            try:
+                open(sentinel, "w").close()
+            except OSError as e:
+                logger.debug("Could not write validation sentinel: %s", e)
+        return True
+    elif response.status_code == 503:
+        logger.warning("Hugging Face model is loading. It may take a moment to be ready.")
+        return True
+    else:
+        logger.warning("Hugging Face API returned status %s. Will attempt to use it anyway.", response.status_code)
+        return True
+
+def _validate_requests_shared() -> bool:
+    """Run the requests probe unless another worker passed it within VALIDATION_TTL.
+
+    Workers booting together serialize on a lock file; the first probes and
+    the rest find its sentinel once they get the lock.
+    """
+    sentinel = _validation_sentinel()
+    if _recently_validated(sentinel):
+        logger.info("Hugging Face API validated by another worker recently, skipping probe")
+        return True
+    try:
+        os.makedirs(settings.hf_cache_dir, exist_ok=True)
+        lock_file = open(sentinel + ".lock", "w")
+    except OSError as e:
+        logger.debug("Validation lock unavailable (%s), probing without it", e)
+        return _probe_requests_api(None)
+    with lock_file:  # closing the file releases the lock
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        if _recently_validated(sentinel):
+            logger.info("Hugging Face API validated by another worker recently, skipping probe")
+            return True
+        return _probe_requests_api(sentinel)
+
+@lru_cache(maxsize=1)
 def validate_huggingface_key() -> bool:
-    """Validate Hugging Face API configuration on startup."""
+    """Validate Hugging Face API configuration on startup (result cached per process)."""
     if not HF_HUB_AVAILABLE and not REQUESTS_AVAILABLE:
         logger.warning("Neither huggingface_hub nor requests available. Hugging Face API features disabled.")
         return False
@@ -103,13 +348,9 @@ def validate_huggingface_key() -> bool:
         logger.info("Skipping Hugging Face API validation because HUGGINGFACE_FORCE_FALLBACK is enabled.")
         return False
     
-    if not is_available:
-        logger.warning("Hugging Face API is not available. AI features will use fallbacks.")
-        return False
-    
     # Test API availability with a simple request (non-blocking, quick timeout)
     try:
-        if HF_HUB_AVAILABLE and client:
+        if HF_HUB_AVAILABLE and _get_async_client():
             # Test with InferenceClient (don't block on validation)
             try:
                 # Just check if client is initialized, don't make actual API call
@@ -117,78 +358,420 @@ def validate_huggingface_key() -> bool:
                 logger.info("Hugging Face InferenceClient initialized (using huggingface_hub)")
                 return True
             except Exception as e:
-                logger.warning(f"Hugging Face API test failed: {e}. Will attempt to use it anyway.")
+                logger.warning("Hugging Face API test failed: %s. Will attempt to use it anyway.", e)
                 return True  # Allow attempts
         elif REQUESTS_AVAILABLE:
-            # Fallback to requests (old method)
-            headers = {}
-            if HUGGINGFACE_API_KEY and HUGGINGFACE_API_KEY not in ["", "placeholder", "your_huggingface_api_key_here"]:
-                headers["Authorization"] = f"Bearer {HUGGINGFACE_API_KEY}"
-            
-            # Use the correct endpoint format
-            test_url = f"https://router.huggingface.co/hf-inference/models/{HF_MODEL}"
-
-            response = requests.post(
-                test_url,
-                headers=headers,
-                json={"inputs": "test"},
-                timeout=5
-            )
-            
-            if response.status_code == 200:
-                logger.info("Hugging Face API validated successfully (using requests)")
-                return True
-            elif response.status_code == 503:
-                logger.warning("Hugging Face model is loading. It may take a moment to be ready.")
-                return True
-            else:
-                logger.warning(f"Hugging Face API returned status {response.status_code}. Will attempt to use it anyway.")
-                return True
+            return _validate_requests_shared()
     except Exception as e:
-        logger.warning(f"Could not validate Hugging Face API: {e}. Will attempt to use it anyway.")
+        logger.warning("Could not validate Hugging Face API: %s. Will attempt to use it anyway.", e)
         return True  # Return True to allow attempts, but log the warning
 
-def extract_json_from_text(text: str) -> Optional[Dict[str, Any]]:
-    """Extract JSON from text that might contain markdown code blocks or extra text."""
+# Model output cleanup patterns, compiled once
+_RE_CODEBLOCK = re.compile(r'```(?:json)?\s*')
+_RE_TRAIL_COMMA_OBJ = re.compile(r',\s*}')
+_RE_TRAIL_COMMA_ARR = re.compile(r',\s*]')
+_JSON_DECODER = json.JSONDecoder()
+# Opening brackets tried before falling back to the trailing-comma repair
+JSON_MAX_CANDIDATES = 8
+
+def _decode_object(text: str, start: int, closer: str = '}') -> Any:
+    """Parse the JSON value opening at text[start]; raises ValueError if there is none.
+
+    The usual reply is a single object (or array, with closer ']'), which orjson
+    parses in one go. Anything after the closing bracket that is not whitespace
+    (prose, a second object) makes that fail, and raw_decode then takes just the
+    first complete value.
+    """
+    end = text.rfind(closer)
+    if end > start:
+        try:
+            return orjson.loads(text[start:end + 1])
+        except orjson.JSONDecodeError:
+            pass
+    return _JSON_DECODER.raw_decode(text, start)[0]
+
+def extract_json_from_text(text: str, opener: str = '{') -> Optional[Any]:
+    """Extract JSON from text that might contain markdown code blocks or extra text.
+
+    Looks for an object by default; pass opener='[' to extract an array instead.
+    """
     if not text:
         return None
+    closer = '}' if opener == '{' else ']'
     
     # Remove markdown code blocks
-    text = re.sub(r'```json\s*', '', text)
-    text = re.sub(r'```\s*', '', text)
+    text = _RE_CODEBLOCK.sub('', text)
     text = text.strip()
     
-    # Remove common prefixes that models might add
-    text = re.sub(r'^[^{]*', '', text)  # Remove everything before first {
-    text = re.sub(r'[^}]*$', '', text)  # Remove everything after last }
-    text = text.strip()
-    
-    # Try to find JSON object (more flexible matching)
-    json_match = re.search(r'\{.*\}', text, re.DOTALL)
-    if json_match:
-        json_str = json_match.group()
+    # Decode the first JSON value; raw_decode ignores any chatter after it
+    start = text.find(opener)
+    if start < 0:
+        logger.warning("Failed to parse JSON from text. First 200 chars: %s", text[:200])
+        return None
+
+    # A stray bracket in leading prose ("use {name} here: {...}") is not the
+    # reply; move on to the next candidate instead of giving up on the text
+    candidate = start
+    for _ in range(JSON_MAX_CANDIDATES):
         try:
-            parsed = json.loads(json_str)
+            parsed = _decode_object(text, candidate, closer)
             logger.info("Successfully extracted JSON from API response")
             return parsed
-        except json.JSONDecodeError as e:
-            logger.warning(f"Failed to parse JSON match: {e}")
-            # Try to fix common JSON issues
-            json_str = re.sub(r',\s*}', '}', json_str)  # Remove trailing commas
-            json_str = re.sub(r',\s*]', ']', json_str)  # Remove trailing commas in arrays
+        except ValueError as e:
+            error = e
+        candidate = text.find(opener, candidate + 1)
+        if candidate < 0:
+            break
+    logger.warning("Failed to parse JSON match: %s", error)
+    # Try to fix common JSON issues
+    json_str = _RE_TRAIL_COMMA_OBJ.sub('}', text[start:])  # Remove trailing commas
+    json_str = _RE_TRAIL_COMMA_ARR.sub(']', json_str)  # Remove trailing commas in arrays
+    try:
+        return _decode_object(json_str, 0, closer)
+    except ValueError:
+        logger.warning("Failed to parse JSON from text. First 200 chars: %s", json_str[:200])
+        return None
+
+def _build_client(class_name: str):
+    """Construct a huggingface_hub Inference client with the current key, or None."""
+    global HF_HUB_AVAILABLE
+    api_key, has_valid_key = _KEY_STATE
+    try:
+        client_cls = getattr(importlib.import_module("huggingface_hub"), class_name)
+    except ImportError as e:
+        logger.warning("Could not import huggingface_hub: %s, will use requests library", e)
+        HF_HUB_AVAILABLE = False
+        return None
+    try:
+        built = client_cls(token=api_key if has_valid_key else None)
+    except Exception as e:
+        logger.warning("Failed to initialize Hugging Face %s: %s, will use requests library", class_name, e)
+        return None
+    logger.info("Hugging Face %s initialized %s", class_name,
+                "with API key" if has_valid_key else "without API key (using public models)")
+    return built
+
+def _get_async_client():
+    """Return the AsyncInferenceClient, creating it on first use."""
+    global _async_client
+    if _async_client is None:
+        _async_client = _build_client("AsyncInferenceClient")
+    return _async_client
+
+def _async_limit() -> asyncio.Semaphore:
+    """Per-event-loop cap on concurrent async Hugging Face calls."""
+    global _async_semaphore
+    loop = asyncio.get_running_loop()
+    if _async_semaphore is None or _async_semaphore[0] is not loop:
+        _async_semaphore = (loop, asyncio.Semaphore(ASYNC_MAX_CONCURRENCY))
+    return _async_semaphore[1]
+
+async def _run_http(func, *args):
+    """Run a blocking raw-HTTP call on _HTTP_EXECUTOR, within the per-loop call limit."""
+    async with _async_limit():
+        return await asyncio.get_running_loop().run_in_executor(_HTTP_EXECUTOR, func, *args)
+
+def _wants_fallback_model(model_error: Exception) -> bool:
+    error_str = str(model_error).lower()
+    return "mistral" in HF_MODEL.lower() or "not supported" in error_str or "conversational" in error_str or "empty" in error_str
+
+def _backoff(base: float) -> float:
+    """Capped retry delay with +/-50% jitter so concurrent retries spread out."""
+    return min(base, MAX_BACKOFF_SECONDS) * random.uniform(0.5, 1.5)
+
+def _rate_limit_backoff(base: float) -> float:
+    """Full-jitter delay for 429s: anywhere in [0, capped base], so callers
+    throttled together don't come back together and trip the limit again."""
+    return random.uniform(0, min(base, MAX_BACKOFF_SECONDS))
+
+def _hub_retry_delay(e: Exception, attempt: int, max_retries: int) -> Optional[float]:
+    """Seconds to wait before retrying an InferenceClient error, or None to give up."""
+    error_str = str(e).lower()
+    last_attempt = attempt >= max_retries - 1
+    if "503" in error_str or "loading" in error_str:
+        if last_attempt:
+            logger.warning("Model is still loading after all retries, trying requests library")
+            return None
+        wait_time = _backoff((2 ** attempt) * 5)
+        logger.warning("Model is loading, retrying in %.1fs (attempt %s/%s)", wait_time, attempt + 1, max_retries)
+        return wait_time
+    if "429" in error_str or "rate limit" in error_str:
+        if last_attempt:
+            logger.warning("Rate limit exceeded, trying requests library")
+            return None
+        wait_time = _rate_limit_backoff((2 ** attempt) * 2)
+        logger.warning("Rate limit hit, retrying in %.1fs (attempt %s/%s)", wait_time, attempt + 1, max_retries)
+        return wait_time
+    if "403" in error_str or "permission" in error_str:
+        logger.warning("Permission error (403), trying requests library without API key")
+        return None  # Skip to requests library, try without key
+    logger.warning("Hugging Face InferenceClient error: %s: %s", type(e).__name__, str(e)[:200])
+    if last_attempt:
+        logger.warning("All InferenceClient attempts failed, trying requests library")
+        return None
+    return _backoff(2 ** attempt)
+
+def _hub_result(result: str, model: str) -> Optional[Dict[str, Any]]:
+    # stream=False: text_generation returns the generated text as a plain str
+    if result and result.strip():
+        return {"content": result.strip(), "model": model}
+    return None
+
+async def _call_hub_async(prompt: str, max_retries: int, max_length: int) -> Optional[Dict[str, Any]]:
+    """Try the huggingface_hub client; None sends the caller to the HTTP fallbacks.
+
+    Awaits the network and backs off with asyncio.sleep.
+    """
+    if not HF_HUB_AVAILABLE or not _get_async_client():
+        return None
+    for attempt in range(max_retries):
+        try:
+            logger.info("Attempting async Hugging Face API call (attempt %s/%s, model: %s)", attempt + 1, max_retries, HF_MODEL)
             try:
-                return json.loads(json_str)
-            except json.JSONDecodeError:
-                pass
-    
-    # Try parsing the whole text
+                async with _async_limit():
+                    result = _hub_result(await _async_client.text_generation(
+                        prompt,
+                        model=HF_MODEL,
+                        max_new_tokens=max_length,
+                        temperature=0.7,
+                        stream=False
+                    ), HF_MODEL)
+                if result is None:
+                    raise ValueError("Empty response from API")
+                logger.info("✅ Hugging Face API call successful (async, attempt %s, response length: %s)", attempt + 1, len(result["content"]))
+                return result
+            except (ValueError, TypeError) as model_error:
+                if not _wants_fallback_model(model_error):
+                    raise
+                logger.warning("Model %s failed (%s), trying fallback model: %s", HF_MODEL, model_error, FALLBACK_MODEL)
+                try:
+                    async with _async_limit():
+                        result = _hub_result(await _async_client.text_generation(
+                            prompt,
+                            model=FALLBACK_MODEL,
+                            max_new_tokens=max_length,
+                            temperature=0.7,
+                            stream=False
+                        ), FALLBACK_MODEL)
+                    if result is None:
+                        raise ValueError("Empty response from fallback model")
+                    logger.info("✅ Using fallback model: %s", FALLBACK_MODEL)
+                    return result
+                except Exception as fallback_error:
+                    logger.warning("Fallback model also failed: %s", fallback_error)
+        except Exception as e:
+            wait_time = _hub_retry_delay(e, attempt, max_retries)
+            if wait_time is None:
+                break
+            await asyncio.sleep(wait_time)
+    return None
+
+# (endpoint, sent_key) pairs that returned 401/403/410 or could not connect are
+# skipped until the stored monotonic deadline, across all callers
+ENDPOINT_BLACKLIST_TTL = 600.0
+_ENDPOINT_BLACKLIST: Dict[Tuple[str, bool], float] = {}
+
+# The legacy api-inference host; once it answers 410 or refuses connections the
+# gpt2 last resort on the same host is skipped too, instead of another timeout
+API_INFERENCE_HOST = "https://api-inference.huggingface.co/"
+SIMPLIFIED_URL = API_INFERENCE_HOST + "models/gpt2"
+
+def _blacklist_endpoint(key: Tuple[str, bool]) -> None:
+    _ENDPOINT_BLACKLIST[key] = time.monotonic() + ENDPOINT_BLACKLIST_TTL
+
+def _is_blacklisted(key: Tuple[str, bool]) -> bool:
+    return time.monotonic() < _ENDPOINT_BLACKLIST.get(key, 0.0)
+
+# A single timeout or reset is usually a network blip; only this many
+# consecutive connection failures blacklist an endpoint. 410/401/403 answers
+# still blacklist it straight away.
+CONNECTION_FAILURE_THRESHOLD = 2
+_CONNECTION_FAILURES: Dict[Tuple[str, bool], int] = {}
+
+def _connection_failed(key: Tuple[str, bool]) -> bool:
+    """Count a connection failure; returns True once it blacklisted the endpoint."""
+    failures = _CONNECTION_FAILURES.get(key, 0) + 1
+    if failures < CONNECTION_FAILURE_THRESHOLD:
+        _CONNECTION_FAILURES[key] = failures
+        return False
+    _CONNECTION_FAILURES.pop(key, None)
+    _blacklist_endpoint(key)
+    return True
+
+def _mark_host_down(api_url: str) -> None:
+    if api_url.startswith(API_INFERENCE_HOST):
+        _blacklist_endpoint((SIMPLIFIED_URL, False))
+
+@dataclass(frozen=True, slots=True)
+class _Attempt:
+    """One endpoint and auth mode in the raw HTTP plan."""
+    endpoint: str
+    use_auth: bool
+
+    @property
+    def key(self) -> Tuple[str, bool]:
+        return (self.endpoint, self.use_auth)
+
+    @property
+    def label(self) -> str:
+        return 'API key' if self.use_auth else 'public access'
+
+def _response_content(result: Any) -> str:
+    """Generated text from an Inference API JSON body, whatever its shape."""
+    if isinstance(result, list) and len(result) > 0:
+        if isinstance(result[0], dict):
+            return result[0].get("generated_text", result[0].get("text", ""))
+        return str(result[0])
+    if isinstance(result, dict):
+        return result.get("generated_text", result.get("text", str(result)))
+    return str(result)
+
+def _post_once(attempt: _Attempt, payload: Dict[str, Any], try_index: int, max_retries: int):
+    """POST once; returns the result dict, a retry wait in seconds, or None to move on."""
+    can_retry = try_index < max_retries - 1
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        logger.warning(f"Failed to parse JSON from text. First 200 chars: {text[:200]}")
+        response = _HTTP.post(
+            attempt.endpoint,
+            headers=None if attempt.use_auth else _NO_AUTH,
+            json=payload,
+            timeout=30
+        )
+        status = response.status_code
+        _CONNECTION_FAILURES.pop(attempt.key, None)  # the endpoint answered
+        if status == 200:
+            content = _response_content(orjson.loads(response.content))
+            if content and content.strip():
+                logger.info("✅ Hugging Face API call successful (using requests, %s)", attempt.endpoint)
+                _ENDPOINT_BLACKLIST.pop(attempt.key, None)
+                return {"content": content.strip(), "model": HF_MODEL}
+            logger.warning("Empty response content, trying next endpoint/key combination")
+            return None
+        if status == 410:
+            logger.warning("Endpoint %s is deprecated (410), trying next endpoint", attempt.endpoint)
+            _blacklist_endpoint(attempt.key)
+            _mark_host_down(attempt.endpoint)
+            return None
+        if status == 401:
+            _blacklist_endpoint(attempt.key)
+            if attempt.use_auth:
+                logger.warning("Unauthorized (401) even with API key, trying next endpoint")
+            else:
+                logger.warning("Unauthorized (401) without API key, trying next option")
+            return None
+        if status == 403:
+            logger.warning("Permission denied (403) with %s, trying next option", attempt.label)
+            _blacklist_endpoint(attempt.key)
+            return None
+        if status in (503, 429):
+            if not can_retry:
+                return None
+            wait_time = _backoff((2 ** try_index) * 5) if status == 503 else _rate_limit_backoff((2 ** try_index) * 2)
+            logger.warning("%s, retrying in %.1fs (attempt %s/%s)",
+                           "Model is loading" if status == 503 else "Rate limit hit", wait_time, try_index + 1, max_retries)
+            return wait_time
+        logger.warning("Hugging Face API error: %s - %s", status, response.text[:200])
+        return _backoff(2 ** try_index) if can_retry else None
+    except requests.exceptions.Timeout:
+        logger.warning("Hugging Face API timeout (attempt %s/%s)", try_index + 1, max_retries)
+        return _backoff(2 ** try_index) if can_retry else None
+    except requests.exceptions.RequestException as e:
+        logger.warning("Hugging Face API connection error: %s, trying next option", e)
+        if _connection_failed(attempt.key) and isinstance(e, requests.exceptions.ConnectionError):
+            _mark_host_down(attempt.endpoint)
+        return None
+    except Exception as e:
+        logger.warning("Unexpected error with Hugging Face API: %s, trying next option", e)
         return None
 
-def call_huggingface_with_fallback(
+def _request_plan(prompt: str, max_length: int) -> Tuple[List[_Attempt], Dict[str, Any]]:
+    """Endpoint/auth attempts in order, and the payload posted to each."""
+    # Each endpoint with the key first when there is one (sent by the session), then
+    # public access. The legacy inference API may work for some models; the router
+    # endpoint requires Inference Provider permissions but is tried anyway.
+    auth_modes = (True, False) if _KEY_STATE[1] else (False,)
+    plan = [
+        _Attempt(endpoint, use_auth)
+        for endpoint in (
+            f"https://api-inference.huggingface.co/models/{HF_MODEL}",
+            f"https://router.huggingface.co/hf-inference/models/{HF_MODEL}",
+        )
+        for use_auth in auth_modes
+    ]
+    payload = {
+        "inputs": prompt,
+        "parameters": {
+            "max_length": max_length,
+            "temperature": 0.7,
+            "do_sample": True,
+        }
+    }
+    return plan, payload
+
+async def _call_requests_async(prompt: str, max_retries: int, max_length: int) -> Optional[Dict[str, Any]]:
+    """Post to the raw Inference API endpoints, with and without the API key.
+
+    Each POST runs on _HTTP_EXECUTOR; retry waits are awaited.
+    """
+    if not REQUESTS_AVAILABLE:
+        return None
+    plan, payload = _request_plan(prompt, max_length)
+    for attempt in plan:
+        if _is_blacklisted(attempt.key):
+            continue
+        logger.info("Using requests library with %s to %s", attempt.label, attempt.endpoint)
+        for try_index in range(max_retries):
+            outcome = await _run_http(_post_once, attempt, payload, try_index, max_retries)
+            if outcome is None:
+                break
+            if isinstance(outcome, dict):
+                return outcome
+            await asyncio.sleep(outcome)
+    return None
+
+def _call_simplified(prompt: str) -> Optional[Dict[str, Any]]:
+    """Last resort: a truncated prompt against a small public model."""
+    if not REQUESTS_AVAILABLE:
+        return None
+    if _is_blacklisted((SIMPLIFIED_URL, False)):
+        logger.debug("Skipping gpt2 fallback, %s recently unavailable", API_INFERENCE_HOST)
+        return None
+    logger.info("All standard methods failed, trying simplified approach...")
+    try:
+        # Try with a very simple model that might work
+        response = _HTTP.post(
+            SIMPLIFIED_URL,
+            headers=_NO_AUTH,
+            json={"inputs": prompt[:100]},  # Truncate prompt for simpler models
+            timeout=15
+        )
+        _CONNECTION_FAILURES.pop((SIMPLIFIED_URL, False), None)
+        if response.status_code == 200:
+            result = orjson.loads(response.content)
+            if isinstance(result, list) and len(result) > 0:
+                content = result[0].get("generated_text", "")
+                if content:
+                    logger.info("✅ Simplified API call successful")
+                    return {
+                        "content": content.strip(),
+                        "model": "gpt2"
+                    }
+        elif response.status_code in (404, 410):
+            _blacklist_endpoint((SIMPLIFIED_URL, False))
+    except Exception as e:
+        logger.debug("Simplified approach also failed: %s", e)
+        if REQUESTS_AVAILABLE and isinstance(e, requests.exceptions.ConnectionError):
+            _connection_failed((SIMPLIFIED_URL, False))
+    return None
+
+async def _call_http_fallbacks_async(prompt: str, max_retries: int, max_length: int) -> Optional[Dict[str, Any]]:
+    """Raw-HTTP attempts used once the InferenceClient path has given up."""
+    result = (await _call_requests_async(prompt, max_retries, max_length)
+              or await _run_http(_call_simplified, prompt))
+    if result is None:
+        logger.error("All Hugging Face API attempts failed")
+    return result
+
+async def call_huggingface_async(
     prompt: str,
     max_retries: int = 3,
     max_length: int = 512
@@ -196,6 +779,10 @@ def call_huggingface_with_fallback(
     """
     Call Hugging Face Inference API with retry logic.
     
+    Model calls and retry waits yield to the event loop, so concurrent requests
+    overlap their round trips. Raw-HTTP fallback posts run on a dedicated thread pool; their
+    retry waits are awaited too.
+    
     Args:
         prompt: Input text prompt
         max_retries: Maximum number of retries
@@ -204,302 +791,102 @@ def call_huggingface_with_fallback(
     Returns:
         Dict with 'content' and 'model' keys, or None if all attempts failed
     """
-    if not is_huggingface_available():
+    if not _AVAILABLE:
         return None
     
-    # Reload API key from environment (in case it was updated)
-    global HUGGINGFACE_API_KEY, client
-    current_api_key = os.getenv("HUGGINGFACE_API_KEY", "").strip()
-    if current_api_key and current_api_key != HUGGINGFACE_API_KEY:
-        HUGGINGFACE_API_KEY = current_api_key
-        logger.info("Reloaded Hugging Face API key from environment")
-        client = None  # Force reinitialization
-    
-    # Use huggingface_hub InferenceClient (recommended)
-    # But if it fails, fall back to requests library which is more reliable
-    hf_hub_success = False
-    if HF_HUB_AVAILABLE:
-        # Reinitialize client if needed (in case API key was updated or not initialized)
-        if not client:
-            try:
-                # Check if we have a valid API key (not placeholder)
-                has_valid_key = (
-                    HUGGINGFACE_API_KEY and 
-                    HUGGINGFACE_API_KEY not in ["", "placeholder", "your_huggingface_api_key_here"] and
-                    len(HUGGINGFACE_API_KEY) > 10 and
-                    not HUGGINGFACE_API_KEY.startswith("your_")
-                )
-                
-                if has_valid_key:
-                    try:
-                        client = InferenceClient(token=HUGGINGFACE_API_KEY)
-                        logger.info(f"Hugging Face InferenceClient initialized with API key (key length: {len(HUGGINGFACE_API_KEY)})")
-                    except Exception as e:
-                        logger.warning(f"Failed to initialize with API key: {e}, trying without key")
-                        client = InferenceClient()  # Try without key
-                        logger.info("Hugging Face InferenceClient initialized without API key")
-                else:
-                    # Try without key for public models
-                    client = InferenceClient()
-                    logger.info("Hugging Face InferenceClient initialized without API key (using public models)")
-            except Exception as e:
-                logger.warning(f"Failed to initialize Hugging Face InferenceClient: {e}, will use requests library")
-                client = None
-        
-        if client:
-            for attempt in range(max_retries):
-                try:
-                    logger.info(f"Attempting Hugging Face API call (attempt {attempt + 1}/{max_retries}, model: {HF_MODEL})")
-                    # Try the configured model first
-                    try:
-                        # text_generation may return a generator or string
-                        result_gen = client.text_generation(
-                            prompt,
-                            model=HF_MODEL,
-                            max_new_tokens=max_length,
-                            temperature=0.7
-                        )
-                        # Handle different return types
-                        if isinstance(result_gen, str):
-                            result = result_gen
-                        elif hasattr(result_gen, '__iter__'):
-                            try:
-                                result = ''.join(result_gen)
-                            except (StopIteration, TypeError):
-                                # If generator is empty or fails, try to get string representation
-                                result = str(result_gen) if result_gen else ''
-                        else:
-                            result = str(result_gen) if result_gen else ''
-                        
-                        if result and len(result.strip()) > 0:
-                            logger.info(f"✅ Hugging Face API call successful (using huggingface_hub, attempt {attempt + 1}, response length: {len(result)})")
-                            hf_hub_success = True
-                            return {
-                                "content": result.strip(),
-                                "model": HF_MODEL
-                            }
-                        else:
-                            raise ValueError("Empty response from API")
-                    except (StopIteration, ValueError, TypeError) as model_error:
-                        # If model fails, try fallback model
-                        error_str = str(model_error).lower()
-                        if "mistral" in HF_MODEL.lower() or "not supported" in error_str or "conversational" in error_str or "empty" in error_str:
-                            logger.warning(f"Model {HF_MODEL} failed ({model_error}), trying fallback model: google/flan-t5-base")
-                            try:
-                                result_gen = client.text_generation(
-                                    prompt,
-                                    model="google/flan-t5-base",
-                                    max_new_tokens=max_length,
-                                    temperature=0.7
-                                )
-                                if isinstance(result_gen, str):
-                                    result = result_gen
-                                elif hasattr(result_gen, '__iter__'):
-                                    result = ''.join(result_gen)
-                                else:
-                                    result = str(result_gen)
-                                
-                                if result and len(result.strip()) > 0:
-                                    logger.info("✅ Using fallback model: google/flan-t5-base")
-                                    hf_hub_success = True
-                                    return {
-                                        "content": result.strip(),
-                                        "model": "google/flan-t5-base"
-                                    }
-                                else:
-                                    raise ValueError("Empty response from fallback model")
-                            except Exception as fallback_error:
-                                logger.warning(f"Fallback model also failed: {fallback_error}")
-                                # Don't raise, let it fall through to requests library
-                        else:
-                            raise
-                except Exception as e:
-                    error_str = str(e).lower()
-                    if "503" in error_str or "loading" in error_str:
-                        wait_time = (2 ** attempt) * 5
-                        if attempt < max_retries - 1:
-                            logger.warning(f"Model is loading, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                            time.sleep(wait_time)
-                        else:
-                            logger.warning("Model is still loading after all retries, trying requests library")
-                            break
-                    elif "429" in error_str or "rate limit" in error_str:
-                        wait_time = (2 ** attempt) * 2
-                        if attempt < max_retries - 1:
-                            logger.warning(f"Rate limit hit, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                            time.sleep(wait_time)
-                        else:
-                            logger.warning("Rate limit exceeded, trying requests library")
-                            break
-                    elif "403" in error_str or "permission" in error_str:
-                        logger.warning(f"Permission error (403), trying requests library without API key")
-                        break  # Skip to requests library, try without key
-                    else:
-                        logger.warning(f"Hugging Face InferenceClient error: {type(e).__name__}: {str(e)[:200]}")
-                        if attempt < max_retries - 1:
-                            time.sleep(2 ** attempt)
-                        else:
-                            logger.warning("All InferenceClient attempts failed, trying requests library")
-                            break
-    
-    # Fallback to requests library (more reliable for public access)
-    if not hf_hub_success and REQUESTS_AVAILABLE:
-        # Reload API key from environment
-        current_api_key = os.getenv("HUGGINGFACE_API_KEY", "").strip()
-        
-        # Try without API key first (public access, more reliable)
-        # Only use API key if public access fails
-        headers_list = []
-        has_valid_key = (
-            current_api_key and 
-            current_api_key not in ["", "placeholder", "your_huggingface_api_key_here"] and
-            len(current_api_key) > 10 and
-            not current_api_key.startswith("your_")
-        )
-        
-        # Try without key first, then with key if needed
-        if has_valid_key:
-            headers_list.append({"Authorization": f"Bearer {current_api_key}"})
-        headers_list.append({})  # Try without key as fallback
-        
-        # Try multiple endpoints - some may work without special permissions
-        # The router endpoint requires Inference Provider permissions
-        # Try alternative endpoints that might work
-        api_urls = [
-            # Try the inference API endpoint (may work for some models)
-            f"https://api-inference.huggingface.co/models/{HF_MODEL}",
-            # Router endpoint (requires permissions but try anyway)
-            f"https://router.huggingface.co/hf-inference/models/{HF_MODEL}"
-        ]
-        
-        for api_url in api_urls:
-            for headers in headers_list:
-                logger.info(f"Using requests library with {'API key' if headers.get('Authorization') else 'public access'} to {api_url}")
-
-                for attempt in range(max_retries):
-                    try:
-                        response = requests.post(
-                            api_url,
-                            headers=headers,
-                            json={
-                                "inputs": prompt,
-                                "parameters": {
-                                    "max_length": max_length,
-                                    "temperature": 0.7,
-                                    "do_sample": True,
-                                }
-                            },
-                            timeout=30
-                        )
-                        
-                        if response.status_code == 200:
-                            result = response.json()
-                            # Parse response format
-                            if isinstance(result, list) and len(result) > 0:
-                                if isinstance(result[0], dict):
-                                    content = result[0].get("generated_text", result[0].get("text", ""))
-                                else:
-                                    content = str(result[0])
-                            elif isinstance(result, dict):
-                                content = result.get("generated_text", result.get("text", str(result)))
-                            else:
-                                content = str(result)
-                            
-                            if content and len(content.strip()) > 0:
-                                logger.info(f"✅ Hugging Face API call successful (using requests, {api_url})")
-                                return {
-                                    "content": content.strip(),
-                                    "model": HF_MODEL
-                                }
-                            else:
-                                logger.warning("Empty response content, trying next endpoint/key combination")
-                                break  # Try next headers/URL
-                        
-                        elif response.status_code == 410:
-                            # Endpoint deprecated, try next URL
-                            logger.warning(f"Endpoint {api_url} is deprecated (410), trying next endpoint")
-                            break  # Try next URL
-                        
-                        elif response.status_code == 401:
-                            # Unauthorized - try with API key if we're not using one, or try next endpoint
-                            if not headers.get('Authorization'):
-                                logger.warning("Unauthorized (401) without API key, will try with API key")
-                                break  # Try with API key
-                            else:
-                                logger.warning("Unauthorized (401) even with API key, trying next endpoint")
-                                break  # Try next URL
-                        
-                        elif response.status_code == 503:
-                            wait_time = (2 ** attempt) * 5
-                            if attempt < max_retries - 1:
-                                logger.warning(f"Model is loading, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                                time.sleep(wait_time)
-                            else:
-                                break  # Try next headers/URL
-                        
-                        elif response.status_code == 429:
-                            wait_time = (2 ** attempt) * 2
-                            if attempt < max_retries - 1:
-                                logger.warning(f"Rate limit hit, retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})")
-                                time.sleep(wait_time)
-                            else:
-                                break  # Try next headers/URL
-                        
-                        elif response.status_code == 403:
-                            logger.warning(f"Permission denied (403) with {'API key' if headers.get('Authorization') else 'public access'}, trying next option")
-                            break  # Try next headers/URL
-                        
-                        else:
-                            logger.warning(f"Hugging Face API error: {response.status_code} - {response.text[:200]}")
-                            if attempt < max_retries - 1:
-                                time.sleep(2 ** attempt)
-                            else:
-                                break  # Try next headers/URL
-                    
-                    except requests.exceptions.Timeout:
-                        logger.warning(f"Hugging Face API timeout (attempt {attempt + 1}/{max_retries})")
-                        if attempt < max_retries - 1:
-                            time.sleep(2 ** attempt)
-                        else:
-                            break  # Try next headers/URL
-                    
-                    except requests.exceptions.RequestException as e:
-                        logger.warning(f"Hugging Face API connection error: {e}, trying next option")
-                        break  # Try next headers/URL
-                    
-                    except Exception as e:
-                        logger.warning(f"Unexpected error with Hugging Face API: {e}, trying next option")
-                        break  # Try next headers/URL
-    
-    # If all API attempts failed, try one more time with a simpler model and request
-    if REQUESTS_AVAILABLE:
-        logger.info("All standard methods failed, trying simplified approach...")
-        try:
-            # Try with a very simple model that might work
-            simple_url = "https://api-inference.huggingface.co/models/gpt2"
-            response = requests.post(
-                simple_url,
-                json={"inputs": prompt[:100]},  # Truncate prompt for simpler models
-                timeout=15
-            )
-            if response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    content = result[0].get("generated_text", "")
-                    if content:
-                        logger.info("✅ Simplified API call successful")
-                        return {
-                            "content": content.strip(),
-                            "model": "gpt2"
-                        }
-        except Exception as e:
-            logger.debug(f"Simplified approach also failed: {e}")
-    
-    logger.error("All Hugging Face API attempts failed")
-    return None
+    result = await _call_hub_async(prompt, max_retries, max_length)
+    if result:
+        return result
+    return await _call_http_fallbacks_async(prompt, max_retries, max_length)
 
-def generate_story_with_retry(feedback_text: str) -> Dict[str, Any]:
-    """Generate user story with retry logic. Uses real Hugging Face API, only falls back if absolutely necessary."""
+# (epoch second, ISO-8601 string); rebuilt at most once per second
+_timestamp_cache = (0, "")
+
+def _iso_now() -> str:
+    """Current UTC time as ISO-8601 with a Z suffix, at one-second resolution."""
+    global _timestamp_cache
+    now = int(time.time())
+    if now != _timestamp_cache[0]:
+        _timestamp_cache = (now, datetime.fromtimestamp(now, tz=timezone.utc).isoformat().replace("+00:00", "Z"))
+    return _timestamp_cache[1]
+
+def _preview(text: str, limit: int = 100) -> str:
+    """Shorten text for display, appending an ellipsis only when something was cut."""
+    return text if len(text) <= limit else text[:limit] + "..."
+
+# Single-flight: concurrent requests for the same uncached text share one model
+# call. Keyed like the result cache.
+_inflight: Dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+def _join_flight(cache: _ResultCache, feedback_text: str) -> Tuple[str, Future, bool]:
+    """Return (key, future, leader); only the leader runs the generation."""
+    key = _cache_key(cache.kind, feedback_text)
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return key, future, False
+        future = _inflight[key] = Future()
+    return key, future, True
+
+def _cache_put(cache: _ResultCache, feedback_text: str, value: Dict[str, Any]) -> None:
+    """cache.put that logs instead of raising; a failed write never fails a generation."""
+    try:
+        cache.put(feedback_text, value)
+    except Exception as e:
+        logger.debug("Result cache write failed: %s", e)
+
+async def _store_result(cache: _ResultCache, feedback_text: str, result: Dict[str, Any]) -> None:
+    """Cache real model output, off the event loop: put may embed the text and write to the disk tier."""
+    if result.get("source") == "huggingface":
+        await asyncio.to_thread(_cache_put, cache, feedback_text, dict(result))
+
+def _settle_flight(key: str, future: Future, result: Optional[Dict[str, Any]], error: Optional[BaseException]) -> None:
+    """Resolve the flight for its followers and retire it, whatever the outcome."""
+    try:
+        if error is None:
+            future.set_result(dict(result))
+        elif isinstance(error, Exception):
+            future.set_exception(error)
+        else:
+            # A cancelled leader hands followers None so they generate for themselves
+            future.set_result(None)
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+
+async def _cached_generation_async(cache: _ResultCache, generate, feedback_text: str) -> Dict[str, Any]:
+    """Serve a repeated feedback text from cache; store only real model output.
+
+    Concurrent calls for the same text wait for the first one instead of
+    making their own model call. Cache lookups and writes run in a worker
+    thread: the disk tier does SQLite I/O, and the semantic tier encodes the
+    text and scores it against every cached vector.
+    """
+    cached = await asyncio.to_thread(cache.get, feedback_text)
+    if cached is not None:
+        return dict(cached)
+    key, future, leader = _join_flight(cache, feedback_text)
+    if not leader:
+        # shield: a cancelled follower must not cancel the shared future
+        shared = await asyncio.shield(asyncio.wrap_future(future))
+        return dict(shared) if shared is not None else await generate(feedback_text)
+    result = error = None
+    try:
+        result = await generate(feedback_text)
+        await _store_result(cache, feedback_text, result)
+    except BaseException as e:
+        if result is None:  # cancelled while storing: followers still get the result
+            error = e
+        raise
+    finally:
+        _settle_flight(key, future, result, error)
+    return result
+
+def _story_precheck(feedback_text: str) -> Optional[Dict[str, Any]]:
+    """Return a fallback story when the API must not or cannot be used, else None."""
+    if _AVAILABLE:
+        return None
     # Check if we should use API - be more lenient, allow attempts even if not perfectly configured
     if FORCE_FALLBACK:
         logger.warning("FORCE_FALLBACK is enabled - using fallback data for user story")
@@ -517,10 +904,13 @@ def generate_story_with_retry(feedback_text: str) -> Dict[str, Any]:
             "source": "fallback",
             "reason": "Required libraries not installed"
         }
-    
-    prompt = f"""Task: Convert customer feedback into a detailed user story with acceptance criteria.
+    return None
+
+_STORY_PROMPT_PREFIX = '''Task: Convert customer feedback into a detailed user story with acceptance criteria.
+
+Customer Feedback: "'''
 
-Customer Feedback: "{feedback_text}"
+_STORY_PROMPT_SUFFIX = '''"
 
 Instructions:
 1. Identify the user persona (who is giving this feedback)
@@ -541,18 +931,42 @@ As a [specific user type/persona], I want [specific feature/functionality/goal]
 **Context:**
 [Brief explanation of why this story addresses the customer feedback]
 
-Make it detailed, specific, and actionable. Base everything on the actual customer feedback provided."""
-    
-    # Increase retries and be more aggressive about using the API
-    logger.info("Attempting to generate user story using Hugging Face API...")
-    result = call_huggingface_with_fallback(
-        prompt=prompt,
-        max_retries=5,  # Increased from 3 to 5
-        max_length=1024  # Increased for more detailed responses
-    )
-    
+Make it detailed, specific, and actionable. Base everything on the actual customer feedback provided.'''
+
+def _story_prompt(feedback_text: str) -> str:
+    return _STORY_PROMPT_PREFIX + feedback_text + _STORY_PROMPT_SUFFIX
+
+# Fallback story themes in priority order. As with _INSIGHT_THEME_RE, the
+# lookahead reports every position where a keyword starts, so overlapping
+# keywords are all seen in one scan, as with separate substring checks.
+_THEME_RE = re.compile(
+    r'(?=(?P<stab>crash|error|bug)|(?P<perf>slow|performance)|(?P<feat>feature|add|need)|(?P<ui>ui|interface|design))',
+    re.IGNORECASE,
+)
+_THEME_MAP = {
+    "stab": ("fix stability issues", "ensure reliable app performance"),
+    "perf": ("optimize performance", "provide faster response times"),
+    "feat": ("add requested features", "meet user needs and expectations"),
+    "ui": ("improve user interface", "create a more intuitive user experience"),
+}
+_DEFAULT_THEME = ("improve the product", "enhance user experience")
+
+def _story_theme(feedback_text: str) -> Tuple[str, str]:
+    """(goal, benefit) for the highest-priority theme mentioned in the feedback."""
+    found = set()
+    for match in _THEME_RE.finditer(feedback_text):
+        if match.lastgroup == "stab":
+            return _THEME_MAP["stab"]
+        found.add(match.lastgroup)
+    for theme in _THEME_MAP:
+        if theme in found:
+            return _THEME_MAP[theme]
+    return _DEFAULT_THEME
+
+def _story_from_result(feedback_text: str, result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Turn a model call result (or None) into the story returned to callers."""
     if result and result.get("content"):
-        logger.info(f"Successfully generated user story using Hugging Face API (model: {result.get('model', 'unknown')})")
+        logger.info("Successfully generated user story using Hugging Face API (model: %s)", result.get('model', 'unknown'))
         return {
             "story": result["content"],
             "source": "huggingface",
@@ -563,24 +977,8 @@ Make it detailed, specific, and actionable. Base everything on the actual custom
         logger.error("All Hugging Face API attempts failed - using enhanced fallback data")
     
     # Generate better fallback story based on feedback content
-    feedback_lower = feedback_text.lower()
     user_type = "customer"
-    goal = "improve the product"
-    benefit = "enhance user experience"
-    
-    # Extract key themes from feedback for better fallback
-    if "crash" in feedback_lower or "error" in feedback_lower or "bug" in feedback_lower:
-        goal = "fix stability issues"
-        benefit = "ensure reliable app performance"
-    elif "slow" in feedback_lower or "performance" in feedback_lower:
-        goal = "optimize performance"
-        benefit = "provide faster response times"
-    elif "feature" in feedback_lower or "add" in feedback_lower or "need" in feedback_lower:
-        goal = "add requested features"
-        benefit = "meet user needs and expectations"
-    elif "ui" in feedback_lower or "interface" in feedback_lower or "design" in feedback_lower:
-        goal = "improve user interface"
-        benefit = "create a more intuitive user experience"
+    goal, benefit = _story_theme(feedback_text)
     
     fallback_story = f"""**User Story:**
 As a {user_type}, I want {goal} so that {benefit}.
@@ -591,7 +989,7 @@ As a {user_type}, I want {goal} so that {benefit}.
 3. User experience is improved based on the feedback provided
 
 **Context:**
-This story addresses the customer feedback: "{feedback_text[:100]}{'...' if len(feedback_text) > 100 else ''}"
+This story addresses the customer feedback: "{_preview(feedback_text)}"
 """
     
     return {
@@ -600,8 +998,139 @@ This story addresses the customer feedback: "{feedback_text[:100]}{'...' if len(
         "reason": "Hugging Face API unavailable. Please ensure your API key has 'Write' permissions at https://huggingface.co/settings/tokens"
     }
 
-def generate_insights_with_retry(feedback_text: str) -> Dict[str, Any]:
-    """Generate insights with retry logic and structured JSON parsing. Uses real Hugging Face API, only falls back if absolutely necessary."""
+async def generate_story_async(feedback_text: str) -> Dict[str, Any]:
+    """Generate a user story, served from the result cache for repeated texts."""
+    return await _cached_generation_async(_story_cache, _generate_story_async, feedback_text)
+
+async def generate_insights_async(feedback_text: str) -> Dict[str, Any]:
+    """Generate insights, served from the result cache for repeated texts."""
+    return await _cached_generation_async(_insights_cache, _generate_insights_async, feedback_text)
+
+async def _generate_story_async(feedback_text: str) -> Dict[str, Any]:
+    """Generate user story with retry logic. Uses real Hugging Face API, only falls back if absolutely necessary."""
+    precheck = _story_precheck(feedback_text)
+    if precheck is not None:
+        return precheck
+    
+    # Increase retries and be more aggressive about using the API
+    logger.info("Attempting to generate user story using Hugging Face API...")
+    result = await call_huggingface_async(
+        prompt=_story_prompt(feedback_text),
+        max_retries=5,  # Increased from 3 to 5
+        max_length=1024  # Increased for more detailed responses
+    )
+    return _story_from_result(feedback_text, result)
+
+# Stories for several feedback texts from one model call; items are numbered in
+# the prompt and the reply is split back on the same [n] markers
+# New tokens one batched call may ask for. Single-item calls already ask for
+# 1024, which the hosted endpoints accept, so a batch never asks for more;
+# chunks are sized so every item still gets its share.
+BATCH_MAX_NEW_TOKENS = 1024
+STORY_BATCH_ITEM_TOKENS = 256
+STORY_BATCH_SIZE = BATCH_MAX_NEW_TOKENS // STORY_BATCH_ITEM_TOKENS
+
+_STORY_BATCH_HEADER = '''Task: Convert each numbered customer feedback below into a detailed user story with acceptance criteria.
+
+Customer Feedback:
+'''
+
+_STORY_BATCH_FOOTER = '''
+
+Answer every feedback in the same order. Start each answer on a new line with its number in brackets, for example [0], then use EXACTLY this format:
+
+**User Story:**
+As a [specific user type/persona], I want [specific feature/functionality/goal] so that [clear business value/benefit].
+
+**Acceptance Criteria:**
+1. [Specific, testable criterion related to the feedback]
+2. [Another specific, testable criterion]
+3. [Third specific, testable criterion]
+
+**Context:**
+[Brief explanation of why this story addresses the customer feedback]
+
+Base every story only on its own feedback.'''
+
+_RE_BATCH_ITEM = re.compile(r'^\[(\d+)\]\s*', re.MULTILINE)
+
+def _story_batch_prompt(texts: List[str]) -> str:
+    return _STORY_BATCH_HEADER + "\n".join(f"[{i}] {text}" for i, text in enumerate(texts)) + _STORY_BATCH_FOOTER
+
+def _split_batch(content: str, count: int) -> Optional[List[str]]:
+    """Split a numbered reply into exactly `count` non-empty parts, else None."""
+    parts = _RE_BATCH_ITEM.split(content)[1:]  # [index, body, index, body, ...]
+    if len(parts) != 2 * count:
+        return None
+    stories = [body.strip() for body in parts[1::2]]
+    if parts[0::2] != [str(i) for i in range(count)] or not all(stories):
+        return None
+    return stories
+
+def _stories_from_batch(chunk: List[str], result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Map each text to its story; None when the reply must be redone per item."""
+    if not (result and result.get("content")):
+        # The API already failed with retries; don't repeat that once per item
+        return {text: _story_from_result(text, None) for text in chunk}
+    stories = _split_batch(result["content"], len(chunk))
+    if stories is None:
+        logger.warning("Batched story reply did not split into %s items, generating individually", len(chunk))
+        return None
+    out = {}
+    for text, story in zip(chunk, stories):
+        out[text] = {"story": story, "source": "huggingface", "model": result["model"]}
+        _cache_put(_story_cache, text, dict(out[text]))
+    return out
+
+def _batch_pending(cache: _ResultCache, texts: List[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+    """Split unique texts into cached results and texts that still need generating."""
+    results = {}
+    pending = []
+    for text in dict.fromkeys(texts):
+        cached = cache.get(text)
+        if cached is not None:
+            results[text] = dict(cached)
+        else:
+            pending.append(text)
+    return results, pending
+
+async def _story_chunk_async(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+    if len(chunk) == 1 or _story_precheck(chunk[0]) is not None:
+        return dict(zip(chunk, await asyncio.gather(*(generate_story_async(text) for text in chunk))))
+    logger.info("Generating %s user stories in one Hugging Face call...", len(chunk))
+    result = await call_huggingface_async(
+        prompt=_story_batch_prompt(chunk),
+        max_retries=5,
+        max_length=min(STORY_BATCH_ITEM_TOKENS * len(chunk), BATCH_MAX_NEW_TOKENS)
+    )
+    # Parsing stores each story, which may embed and hit the disk tier
+    stories = await asyncio.to_thread(_stories_from_batch, chunk, result)
+    if stories is None:
+        stories = dict(zip(chunk, await asyncio.gather(*(generate_story_async(text) for text in chunk))))
+    return stories
+
+async def generate_stories_batch_async(texts: List[str]) -> List[Dict[str, Any]]:
+    """Generate one user story per text, in order, batching uncached texts per model call.
+
+    The per-call chunks run concurrently. A chunk whose generation raises gets
+    the template fallback stories instead of failing the whole batch.
+    """
+    results, pending = await asyncio.to_thread(_batch_pending, _story_cache, texts)
+    chunks = [pending[i:i + STORY_BATCH_SIZE] for i in range(0, len(pending), STORY_BATCH_SIZE)]
+    outcomes = await asyncio.gather(*(_story_chunk_async(chunk) for chunk in chunks), return_exceptions=True)
+    for chunk, outcome in zip(chunks, outcomes):
+        if isinstance(outcome, Exception):
+            logger.warning("Story generation failed for a batch chunk: %s", outcome)
+            outcome = {text: _story_from_result(text, None) for text in chunk}
+        elif isinstance(outcome, BaseException):
+            raise outcome  # cancellation and exits are not generation failures
+        results.update(outcome)
+    return [dict(results[text]) for text in texts]
+
+def _insights_precheck(feedback_text: str) -> Optional[Dict[str, Any]]:
+    """Return a fallback insights payload when the API must not or cannot be used, else None."""
+    if _AVAILABLE:
+        return None
     # Check if we should use API - be more lenient, allow attempts even if not perfectly configured
     if FORCE_FALLBACK:
         logger.warning("FORCE_FALLBACK is enabled - using fallback data for insights")
@@ -611,7 +1140,7 @@ def generate_insights_with_retry(feedback_text: str) -> Dict[str, Any]:
             ],
             "anomalies": [],
             "summary": "AI insights unavailable - using fallback data",
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": _iso_now(),
             "source": "fallback",
             "reason": "HUGGINGFACE_FORCE_FALLBACK is enabled"
         }
@@ -625,27 +1154,28 @@ def generate_insights_with_retry(feedback_text: str) -> Dict[str, Any]:
             ],
             "anomalies": [],
             "summary": "AI insights unavailable - using fallback data",
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": _iso_now(),
             "source": "fallback",
             "reason": "Required libraries not installed"
         }
-    
-    insight_prompt = f"""Analyze this customer feedback and extract detailed insights in JSON format.
+    return None
 
-Customer Feedback: "{feedback_text}"
+# Static instructions first and the feedback last, so the long shared prefix is
+# identical on every call and can be served from a provider's prompt cache
+_INSIGHTS_PROMPT_PREFIX = '''Analyze the customer feedback given at the end and extract detailed insights in JSON format.
 
 Task: Extract themes, sentiment, anomalies, and create a summary.
 
 Return a valid JSON object with this EXACT structure (no markdown, no code blocks, just JSON):
-{{
+{
     "themes": [
-        {{"name": "Theme Name (e.g., User Interface, Performance, Features)", "sentiment": -1.0, "count": 1}},
-        {{"name": "Another Theme", "sentiment": 0.5, "count": 1}},
-        {{"name": "Third Theme", "sentiment": 0.0, "count": 1}}
+        {"name": "Theme Name (e.g., User Interface, Performance, Features)", "sentiment": -1.0, "count": 1},
+        {"name": "Another Theme", "sentiment": 0.5, "count": 1},
+        {"name": "Third Theme", "sentiment": 0.0, "count": 1}
     ],
     "anomalies": ["Specific issue or concern mentioned", "Another concern if any"],
     "summary": "A comprehensive 2-3 sentence summary analyzing the feedback, key themes, sentiment, and actionable insights"
-}}
+}
 
 Requirements:
 - themes: Extract 3-5 distinct themes/topics from the feedback
@@ -657,62 +1187,95 @@ Requirements:
 - Return ONLY valid JSON, no markdown formatting, no code blocks, no explanatory text
 
 Example for feedback "The app crashes when I try to upload files":
-{{
+{
     "themes": [
-        {{"name": "Stability & Reliability", "sentiment": -1.0, "count": 1}},
-        {{"name": "File Upload Feature", "sentiment": -1.0, "count": 1}},
-        {{"name": "User Experience", "sentiment": -0.5, "count": 1}}
+        {"name": "Stability & Reliability", "sentiment": -1.0, "count": 1},
+        {"name": "File Upload Feature", "sentiment": -1.0, "count": 1},
+        {"name": "User Experience", "sentiment": -0.5, "count": 1}
     ],
     "anomalies": ["App crashes during file upload"],
     "summary": "Critical stability issue reported: the app crashes when users attempt to upload files. This indicates a serious bug in the file upload functionality that significantly impacts user experience and app reliability. Immediate investigation and fix required."
-}}"""
+}'''
+
+def _insights_prompt(feedback_text: str) -> str:
+    return _INSIGHTS_PROMPT_PREFIX + '\n\nNow analyze this customer feedback: "' + feedback_text + '"'
+
+# Fallback insight themes in output order. The lookahead reports every position
+# where a keyword starts, so overlapping keywords are all seen in one scan, as
+# with separate substring checks.
+_INSIGHT_THEME_RE = re.compile(
+    r'(?=(?P<stab>crash|error|bug)|(?P<perf>slow|performance|lag)|(?P<ui>ui|interface|design|layout)'
+    r'|(?P<feat>feature|add|missing)|(?P<pos>great|love|excellent|good))',
+    re.IGNORECASE,
+)
+_INSIGHT_THEMES = (
+    ("stab", "Stability & Reliability", -0.8),
+    ("perf", "Performance", -0.6),
+    ("ui", "User Interface", -0.4),
+    ("feat", "Feature Requests", 0.0),
+    ("pos", "Positive Feedback", 0.7),
+)
+
+def _insight_theme_groups(feedback_text: str) -> set:
+    """Names of the _INSIGHT_THEMES groups whose keywords appear in the text."""
+    found = set()
+    for match in _INSIGHT_THEME_RE.finditer(feedback_text):
+        found.add(match.lastgroup)
+        if len(found) == len(_INSIGHT_THEMES):
+            break
+    return found
+
+def _as_float(value: Any, default: float) -> float:
+    """float(value), or default when it does not convert; parsed JSON numbers skip the try."""
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        return float(value)
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return default
+
+def _as_int(value: Any, default: int) -> int:
+    """int(value), or default when it does not convert; parsed JSON ints skip the try."""
+    if type(value) is int:
+        return value
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
+
+def _normalize_insights(insights_json: Dict[str, Any], model: str) -> Dict[str, Any]:
+    """Fill in missing fields of a parsed model reply and stamp its provenance."""
+    # Validate and clean the JSON
+    if "themes" not in insights_json:
+        insights_json["themes"] = []
+    if "anomalies" not in insights_json:
+        insights_json["anomalies"] = []
+    if "summary" not in insights_json:
+        insights_json["summary"] = "Analysis completed"
     
-    # Increase retries and be more aggressive about using the API
-    logger.info("Attempting to generate insights using Hugging Face API...")
-    result = call_huggingface_with_fallback(
-        prompt=insight_prompt,
-        max_retries=5,  # Increased from 3 to 5
-        max_length=1024  # Increased for better JSON responses
-    )
+    # Ensure themes have required fields, sentiment a float and count an int
+    for theme in insights_json["themes"]:
+        if "name" not in theme:
+            theme["name"] = "Unknown"
+        theme["sentiment"] = _as_float(theme.get("sentiment"), 0.0)
+        theme["count"] = _as_int(theme.get("count"), 1)
     
+    insights_json["timestamp"] = _iso_now()
+    insights_json["source"] = "huggingface"
+    insights_json["model"] = model
+    return insights_json
+
+def _insights_from_result(feedback_text: str, result: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Turn a model call result (or None) into the insights payload returned to callers."""
     if result and result.get("content"):
         content = result["content"]
         insights_json = extract_json_from_text(content)
         
         if insights_json and isinstance(insights_json, dict):
-            # Validate and clean the JSON
-            if "themes" not in insights_json:
-                insights_json["themes"] = []
-            if "anomalies" not in insights_json:
-                insights_json["anomalies"] = []
-            if "summary" not in insights_json:
-                insights_json["summary"] = "Analysis completed"
-            
-            # Ensure themes have required fields
-            for theme in insights_json["themes"]:
-                if "name" not in theme:
-                    theme["name"] = "Unknown"
-                if "sentiment" not in theme:
-                    theme["sentiment"] = 0.0
-                if "count" not in theme:
-                    theme["count"] = 1
-                # Ensure sentiment is a float
-                try:
-                    theme["sentiment"] = float(theme["sentiment"])
-                except (ValueError, TypeError):
-                    theme["sentiment"] = 0.0
-                # Ensure count is an int
-                try:
-                    theme["count"] = int(theme["count"])
-                except (ValueError, TypeError):
-                    theme["count"] = 1
-            
-            insights_json["timestamp"] = datetime.utcnow().isoformat() + "Z"
-            insights_json["source"] = "huggingface"
-            insights_json["model"] = result["model"]
-            
-            logger.info(f"Successfully generated insights using Hugging Face API (model: {result.get('model', 'unknown')})")
-            return insights_json
+            logger.info("Successfully generated insights using Hugging Face API (model: %s)", result.get('model', 'unknown'))
+            return _normalize_insights(insights_json, result["model"])
         else:
             logger.warning("Failed to parse JSON from Hugging Face response - retrying with raw content")
             # Try to use raw content even if JSON parsing failed
@@ -722,8 +1285,8 @@ Example for feedback "The app crashes when I try to upload files":
                         {"name": "Feedback Analysis", "sentiment": 0.0, "count": 1}
                     ],
                     "anomalies": [],
-                    "summary": content[:200] + "..." if len(content) > 200 else content,
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
+                    "summary": _preview(content, 200),
+                    "timestamp": _iso_now(),
                     "source": "huggingface",
                     "model": result["model"],
                     "reason": "JSON parsing failed but using raw API response"
@@ -733,49 +1296,130 @@ Example for feedback "The app crashes when I try to upload files":
     logger.error("All Hugging Face API attempts failed - using enhanced fallback data")
     
     # Generate better fallback insights based on feedback content
-    feedback_lower = feedback_text.lower()
-    themes = []
-    anomalies = []
-    sentiment_score = 0.0
-    
-    # Analyze feedback for themes
-    if "crash" in feedback_lower or "error" in feedback_lower or "bug" in feedback_lower:
-        themes.append({"name": "Stability & Reliability", "sentiment": -0.8, "count": 1})
-        anomalies.append("Critical stability issues reported")
-        sentiment_score = -0.7
-    if "slow" in feedback_lower or "performance" in feedback_lower or "lag" in feedback_lower:
-        themes.append({"name": "Performance", "sentiment": -0.6, "count": 1})
-        sentiment_score = min(sentiment_score, -0.5)
-    if "ui" in feedback_lower or "interface" in feedback_lower or "design" in feedback_lower or "layout" in feedback_lower:
-        themes.append({"name": "User Interface", "sentiment": -0.4, "count": 1})
-    if "feature" in feedback_lower or "add" in feedback_lower or "missing" in feedback_lower:
-        themes.append({"name": "Feature Requests", "sentiment": 0.0, "count": 1})
-    if "great" in feedback_lower or "love" in feedback_lower or "excellent" in feedback_lower or "good" in feedback_lower:
-        themes.append({"name": "Positive Feedback", "sentiment": 0.7, "count": 1})
-        sentiment_score = 0.6
+    found = _insight_theme_groups(feedback_text)
+    themes = [
+        {"name": name, "sentiment": sentiment, "count": 1}
+        for group, name, sentiment in _INSIGHT_THEMES
+        if group in found
+    ]
+    anomalies = ["Critical stability issues reported"] if "stab" in found else []
     
     # Default theme if none found
     if not themes:
-        themes.append({"name": "General Feedback", "sentiment": sentiment_score, "count": 1})
+        themes.append({"name": "General Feedback", "sentiment": 0.0, "count": 1})
     
-    # Generate summary
+    # Generate summary, one f-string per branch
     if anomalies:
-        summary = f"Critical issues identified: {', '.join(anomalies)}. " + \
-                 f"Key themes include {', '.join([t['name'] for t in themes[:3]])}. " + \
-                 "Immediate attention required for stability concerns."
+        summary = (f"Critical issues identified: {', '.join(anomalies)}. "
+                   f"Key themes include {', '.join([t['name'] for t in themes[:3]])}. "
+                   "Immediate attention required for stability concerns.")
     else:
-        summary = f"Feedback analysis identifies {len(themes)} key theme(s): {', '.join([t['name'] for t in themes])}. " + \
-                 "Overall sentiment indicates areas for improvement."
+        summary = (f"Feedback analysis identifies {len(themes)} key theme(s): {', '.join([t['name'] for t in themes])}. "
+                   "Overall sentiment indicates areas for improvement.")
     
     return {
         "themes": themes,
         "anomalies": anomalies,
         "summary": summary,
-        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "timestamp": _iso_now(),
         "source": "fallback",
         "reason": "Hugging Face API unavailable. Please ensure your API key has 'Write' permissions at https://huggingface.co/settings/tokens"
     }
 
-# Note: Validation is called from main.py during startup, not at module import time
+async def _generate_insights_async(feedback_text: str) -> Dict[str, Any]:
+    """Generate insights with retry logic and structured JSON parsing. Uses real Hugging Face API, only falls back if absolutely necessary."""
+    precheck = _insights_precheck(feedback_text)
+    if precheck is not None:
+        return precheck
+    
+    # Increase retries and be more aggressive about using the API
+    logger.info("Attempting to generate insights using Hugging Face API...")
+    result = await call_huggingface_async(
+        prompt=_insights_prompt(feedback_text),
+        max_retries=5,  # Increased from 3 to 5
+        max_length=1024  # Increased for better JSON responses
+    )
+    return _insights_from_result(feedback_text, result)
+
+# Same new-token cap as story batches; an insights object needs about as much
+INSIGHTS_BATCH_ITEM_TOKENS = 256
+INSIGHTS_BATCH_SIZE = BATCH_MAX_NEW_TOKENS // INSIGHTS_BATCH_ITEM_TOKENS
+
+_INSIGHTS_BATCH_HEADER = '''Analyze each numbered customer feedback below and extract detailed insights in JSON format.
+
+Customer Feedback:
+'''
+
+_INSIGHTS_BATCH_FOOTER = '''
+
+Return a valid JSON array with exactly one object per feedback, in the same order (no markdown, no code blocks, just JSON). Each object has this EXACT structure:
+{
+    "themes": [
+        {"name": "Theme Name (e.g., User Interface, Performance, Features)", "sentiment": -1.0, "count": 1}
+    ],
+    "anomalies": ["Specific issue or concern mentioned"],
+    "summary": "A comprehensive 2-3 sentence summary analyzing the feedback, key themes, sentiment, and actionable insights"
+}
+
+Requirements:
+- themes: Extract 3-5 distinct themes/topics from each feedback
+  - sentiment: -1.0 (very negative) to 1.0 (very positive), 0.0 (neutral)
+  - count: Number of times this theme appears (usually 1 for single feedback)
+- anomalies: List any urgent issues, bugs, or critical concerns mentioned (can be empty array if none)
+- Base every object only on its own feedback
+- Return ONLY the JSON array, no explanatory text'''
+
+def _insights_batch_prompt(texts: List[str]) -> str:
+    return _INSIGHTS_BATCH_HEADER + "\n".join(f"[{i}] {text}" for i, text in enumerate(texts)) + _INSIGHTS_BATCH_FOOTER
+
+def _insights_from_batch(chunk: List[str], result: Optional[Dict[str, Any]]) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Map each text to its insights; None when the reply must be redone per item."""
+    if not (result and result.get("content")):
+        # The API already failed with retries; don't repeat that once per item
+        return {text: _insights_from_result(text, None) for text in chunk}
+    items = extract_json_from_text(result["content"], opener='[')
+    if not (isinstance(items, list) and len(items) == len(chunk) and all(isinstance(item, dict) for item in items)):
+        logger.warning("Batched insights reply did not parse into %s objects, generating individually", len(chunk))
+        return None
+    out = {}
+    for text, item in zip(chunk, items):
+        out[text] = _normalize_insights(item, result["model"])
+        _cache_put(_insights_cache, text, dict(out[text]))
+    return out
+
+async def _insights_chunk_async(chunk: List[str]) -> Dict[str, Dict[str, Any]]:
+    if len(chunk) == 1 or _insights_precheck(chunk[0]) is not None:
+        return dict(zip(chunk, await asyncio.gather(*(generate_insights_async(text) for text in chunk))))
+    logger.info("Generating insights for %s feedbacks in one Hugging Face call...", len(chunk))
+    result = await call_huggingface_async(
+        prompt=_insights_batch_prompt(chunk),
+        max_retries=5,
+        max_length=min(INSIGHTS_BATCH_ITEM_TOKENS * len(chunk), BATCH_MAX_NEW_TOKENS)
+    )
+    # Parsing stores each result, which may embed and hit the disk tier
+    insights = await asyncio.to_thread(_insights_from_batch, chunk, result)
+    if insights is None:
+        insights = dict(zip(chunk, await asyncio.gather(*(generate_insights_async(text) for text in chunk))))
+    return insights
+
+async def generate_insights_batch_async(texts: List[str]) -> List[Dict[str, Any]]:
+    """Generate insights for every text, in order, packing uncached texts into one model call per chunk.
+
+    The per-call chunks run concurrently. A chunk whose generation raises gets
+    the keyword fallback insights instead of failing the whole batch.
+    """
+    results, pending = await asyncio.to_thread(_batch_pending, _insights_cache, texts)
+    chunks = [pending[i:i + INSIGHTS_BATCH_SIZE] for i in range(0, len(pending), INSIGHTS_BATCH_SIZE)]
+    outcomes = await asyncio.gather(*(_insights_chunk_async(chunk) for chunk in chunks), return_exceptions=True)
+    for chunk, outcome in zip(chunks, outcomes):
+        if isinstance(outcome, Exception):
+            logger.warning("Insights generation failed for a batch chunk: %s", outcome)
+            outcome = {text: _insights_from_result(text, None) for text in chunk}
+        elif isinstance(outcome, BaseException):
+            raise outcome  # cancellation and exits are not generation failures
+        results.update(outcome)
+    return [dict(results[text]) for text in texts]
+
+# Note: Validation is called from app_factory during startup, not at module import time
 # This prevents blocking server startup if the API is slow or unavailable
 
@@ -1,20 +1,63 @@
-from textblob import TextBlob
-from typing import Dict
+from functools import lru_cache
+from typing import Dict, List
+from config import get_settings
+
+# Prefer VADER: scoring is a lexicon lookup per token, with no NLTK tagging.
+# SENTIMENT_BACKEND=textblob opts back into TextBlob polarity.
+_analyzer = None
+if get_settings().sentiment_backend == "vader":
+    try:
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        _analyzer = SentimentIntensityAnalyzer()
+    except ImportError:
+        pass
+
+# Label thresholds: VADER's recommended compound cut-off vs. TextBlob polarity
+VADER_THRESHOLD = 0.05
+TEXTBLOB_THRESHOLD = 0.1
+
+# Only short texts are memoized, so one cache entry never pins a large document
+CACHEABLE_TEXT_LENGTH = 512
+
+def _polarity(text: str) -> float:
+    """Score text with VADER's compound score, or TextBlob polarity if VADER is missing."""
+    if _analyzer is not None:
+        return _analyzer.polarity_scores(text)["compound"]
+    # Imported on first use; TextBlob pulls in NLTK, which is slow to load
+    from textblob import TextBlob
+    return TextBlob(text).sentiment.polarity
+
+_cached_polarity = lru_cache(maxsize=4096)(_polarity)
+
+def warm_up() -> None:
+    """Load the active backend's lexicon now so the first request doesn't pay for it."""
+    _polarity("warmup")
 
 def analyze_sentiment(text: str) -> Dict[str, any]:
-    """Analyze sentiment of text using TextBlob."""
-    blob = TextBlob(text)
-    sentiment = blob.sentiment.polarity
-    
-    if sentiment > 0.1:
+    """Analyze sentiment of text using VADER, falling back to TextBlob."""
+    if len(text) <= CACHEABLE_TEXT_LENGTH:
+        sentiment = _cached_polarity(text)
+    else:
+        sentiment = _polarity(text)
+    threshold = VADER_THRESHOLD if _analyzer is not None else TEXTBLOB_THRESHOLD
+
+    if sentiment > threshold:
         label = "positive"
-    elif sentiment < -0.1:
+    elif sentiment < -threshold:
         label = "negative"
     else:
         label = "neutral"
-    
+
     return {
         "sentiment": float(sentiment),
         "label": label
     }
 
+
+def analyze_sentiment_batch(texts: List[str]) -> List[Dict[str, any]]:
+    """Analyze many texts in one call, scoring each distinct text only once."""
+    results: Dict[str, Dict[str, any]] = {}
+    for text in texts:
+        if text not in results:
+            results[text] = analyze_sentiment(text)
+    return [results[text] for text in texts]
@@ -0,0 +1,66 @@
+"""Signup and login through the module-level user lookup statements.
+
+Run from server/: python -m unittest discover -s tests
+"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# Point settings at throwaway locations before anything reads them
+os.environ.setdefault("HUGGINGFACE_CACHE_DIR", tempfile.mkdtemp())
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from main import app  # noqa: E402
+from services import huggingface_service as hf  # noqa: E402
+
+
+class AuthRoutesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Startup validation would reach the network from a worker thread
+        with mock.patch.object(hf, "validate_huggingface_key", return_value=False), \
+                mock.patch.object(hf, "warm_up_semantic_cache", return_value=False):
+            cls.client = TestClient(app)
+            cls.client.__enter__()
+        cls.credentials = {"username": "auth_user", "password": "s3cret-pass"}
+        cls.client.post("/auth/signup", json={**cls.credentials, "email": "auth_user@example.com"})
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    def test_duplicate_username_is_rejected(self):
+        response = self.client.post(
+            "/auth/signup", json={**self.credentials, "email": "someone_else@example.com"}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "Username already registered")
+
+    def test_duplicate_email_is_rejected(self):
+        response = self.client.post(
+            "/auth/signup",
+            json={"username": "auth_user_2", "password": "x", "email": "auth_user@example.com"},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["detail"], "Email already registered")
+
+    def test_login_then_me(self):
+        token = self.client.post("/auth/login", json=self.credentials).json()["access_token"]
+
+        me = self.client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+        self.assertEqual(me.status_code, 200)
+        self.assertEqual(me.json()["username"], "auth_user")
+
+    def test_bad_credentials_are_rejected(self):
+        wrong_password = self.client.post("/auth/login", json={**self.credentials, "password": "nope"})
+        unknown_user = self.client.post("/auth/login", json={"username": "nobody", "password": "nope"})
+        self.assertEqual(wrong_password.status_code, 401)
+        self.assertEqual(unknown_user.status_code, 401)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+"""Parsing of model replies: numbered batch splits and JSON extraction.
+
+Run from server/: python -m unittest discover -s tests
+"""
+import os
+import tempfile
+import unittest
+
+# Keep the disk result cache out of server/.cache before the service reads settings
+os.environ.setdefault("HUGGINGFACE_CACHE_DIR", tempfile.mkdtemp())
+
+from services import huggingface_service as hf  # noqa: E402
+
+
+class SplitBatchTest(unittest.TestCase):
+    def test_numbered_reply_splits_in_order(self):
+        content = "[0] First story\nwith two lines\n[1] Second story\n[2]   Third story  "
+        self.assertEqual(
+            hf._split_batch(content, 3),
+            ["First story\nwith two lines", "Second story", "Third story"],
+        )
+
+    def test_preamble_before_first_marker_is_dropped(self):
+        self.assertEqual(hf._split_batch("Here you go:\n[0] a\n[1] b", 2), ["a", "b"])
+
+    def test_wrong_item_count_is_rejected(self):
+        self.assertIsNone(hf._split_batch("[0] a\n[1] b", 3))
+        self.assertIsNone(hf._split_batch("[0] a\n[1] b\n[2] c", 2))
+
+    def test_missing_markers_are_rejected(self):
+        self.assertIsNone(hf._split_batch("one story for everything", 2))
+        self.assertIsNone(hf._split_batch("", 1))
+
+    def test_out_of_order_or_skipped_markers_are_rejected(self):
+        self.assertIsNone(hf._split_batch("[1] b\n[0] a", 2))
+        self.assertIsNone(hf._split_batch("[0] a\n[2] c", 2))
+
+    def test_empty_item_is_rejected(self):
+        self.assertIsNone(hf._split_batch("[0] a\n[1]\n", 2))
+
+    def test_marker_inside_a_line_does_not_split(self):
+        self.assertEqual(hf._split_batch("[0] see item [1] above\n[1] b", 2), ["see item [1] above", "b"])
+
+
+class ExtractJsonTest(unittest.TestCase):
+    def test_plain_object(self):
+        self.assertEqual(hf.extract_json_from_text('{"a": 1}'), {"a": 1})
+
+    def test_code_fence_and_trailing_prose(self):
+        text = 'Sure!\n```json\n{"a": [1, 2]}\n```\nLet me know if you need more.'
+        self.assertEqual(hf.extract_json_from_text(text), {"a": [1, 2]})
+
+    def test_leading_stray_braces_are_skipped(self):
+        text = 'Replace {name} and {team} in the template: {"summary": "ok", "themes": []}'
+        self.assertEqual(hf.extract_json_from_text(text), {"summary": "ok", "themes": []})
+
+    def test_first_of_several_objects(self):
+        self.assertEqual(hf.extract_json_from_text('{"a": 1} and also {"b": 2}'), {"a": 1})
+
+    def test_trailing_commas_are_repaired(self):
+        self.assertEqual(hf.extract_json_from_text('{"a": [1, 2,], "b": 3,}'), {"a": [1, 2], "b": 3})
+
+    def test_array_reply(self):
+        text = 'Results:\n```json\n[{"summary": "x"}, {"summary": "y"}]\n```'
+        self.assertEqual(hf.extract_json_from_text(text, opener='['), [{"summary": "x"}, {"summary": "y"}])
+
+    def test_array_reply_after_stray_bracket(self):
+        text = 'One object per [feedback] item: [{"summary": "x"}, {"summary": "y"}]'
+        self.assertEqual(hf.extract_json_from_text(text, opener='['), [{"summary": "x"}, {"summary": "y"}])
+
+    def test_no_json_returns_none(self):
+        self.assertIsNone(hf.extract_json_from_text("no structured data here"))
+        self.assertIsNone(hf.extract_json_from_text(""))
+        self.assertIsNone(hf.extract_json_from_text("{not json at all}"))
+
+
+class InsightsFromBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.chunk = ["parse test alpha", "parse test beta"]
+
+    def test_mismatched_item_count_is_redone_individually(self):
+        result = {"content": '[{"summary": "only one"}]', "model": "m"}
+        self.assertIsNone(hf._insights_from_batch(self.chunk, result))
+
+    def test_non_object_items_are_redone_individually(self):
+        result = {"content": '["a", "b"]', "model": "m"}
+        self.assertIsNone(hf._insights_from_batch(self.chunk, result))
+
+    def test_failed_call_falls_back_without_retrying(self):
+        out = hf._insights_from_batch(self.chunk, None)
+        self.assertEqual(list(out), self.chunk)
+        self.assertTrue(all(item["source"] == "fallback" for item in out.values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
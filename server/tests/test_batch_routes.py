@@ -0,0 +1,115 @@
+"""Batch feedback endpoints: one result per input text, in order, duplicates computed once.
+
+Run from server/: python -m unittest discover -s tests
+"""
+import json
+import os
+import re
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+# Point settings at throwaway locations before anything reads them
+os.environ.setdefault("HUGGINGFACE_CACHE_DIR", tempfile.mkdtemp())
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from auth import get_current_user  # noqa: E402
+from main import app  # noqa: E402
+from services import huggingface_service as hf  # noqa: E402
+
+_RE_PROMPT_ITEM = re.compile(r'^\[(\d+)\] (.+)$', re.MULTILINE)
+
+
+class BatchRoutesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id=1, username="tester")
+        # Startup validation would reach the network from a worker thread
+        with mock.patch.object(hf, "validate_huggingface_key", return_value=False), \
+                mock.patch.object(hf, "warm_up_semantic_cache", return_value=False):
+            cls.client = TestClient(app)
+            cls.client.__enter__()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+        app.dependency_overrides.clear()
+
+    def setUp(self):
+        self.prompts = []
+        for target, value in (("call_huggingface_async", self._fake_call), ("_AVAILABLE", True)):
+            patcher = mock.patch.object(hf, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    async def _fake_call(self, prompt, max_retries=3, max_length=512):
+        """Echo the numbered texts back as a story list or an insights array."""
+        self.prompts.append((prompt, max_length))
+        items = [text for _, text in _RE_PROMPT_ITEM.findall(prompt)]
+        if "JSON array" in prompt:
+            content = json.dumps([{"summary": f"insights for {text}"} for text in items])
+        else:
+            content = "\n".join(f"[{i}] story for {text}" for i, text in enumerate(items))
+        return {"content": content, "model": "stub-model"}
+
+    def test_analyze_batch_keeps_order_and_duplicates(self):
+        texts = ["I love this product", "This is terrible and broken", "I love this product"]
+
+        response = self.client.post("/feedback/analyze/batch", json={"texts": texts})
+
+        self.assertEqual(response.status_code, 200)
+        labels = [item["label"] for item in response.json()]
+        self.assertEqual(labels[0], labels[2])
+        self.assertNotEqual(labels[0], labels[1])
+
+    def test_story_batch_keeps_order_and_calls_once_per_unique_text(self):
+        texts = ["route story one", "route story two", "route story one", "route story three"]
+
+        response = self.client.post("/feedback/generate-story/batch", json={"texts": texts})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["story"] for item in response.json()], [f"story for {text}" for text in texts])
+        # Three unique texts fit one chunk, so the model is called once
+        self.assertEqual(len(self.prompts), 1)
+        prompt, max_length = self.prompts[0]
+        self.assertEqual(_RE_PROMPT_ITEM.findall(prompt), [
+            ("0", "route story one"), ("1", "route story two"), ("2", "route story three"),
+        ])
+        self.assertLessEqual(max_length, hf.BATCH_MAX_NEW_TOKENS)
+
+    def test_story_batch_serves_repeats_from_cache(self):
+        texts = ["route cached story a", "route cached story b"]
+        self.client.post("/feedback/generate-story/batch", json={"texts": texts})
+        self.prompts.clear()
+
+        response = self.client.post("/feedback/generate-story/batch", json={"texts": texts[::-1] + texts})
+
+        self.assertEqual(
+            [item["story"] for item in response.json()], [f"story for {text}" for text in texts[::-1] + texts]
+        )
+        self.assertEqual(self.prompts, [])
+
+    def test_insights_batch_keeps_order_across_chunks(self):
+        texts = [f"route insight {i}" for i in range(hf.INSIGHTS_BATCH_SIZE + 2)]
+        texts.insert(1, texts[0])
+
+        response = self.client.post("/feedback/insights/batch", json={"texts": texts})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([item["summary"] for item in response.json()], [f"insights for {text}" for text in texts])
+        self.assertTrue(all(item["source"] == "huggingface" for item in response.json()))
+        # The duplicate is not sent again; the remainder goes in a second chunk
+        sent = [text for prompt, _ in self.prompts for _, text in _RE_PROMPT_ITEM.findall(prompt)]
+        self.assertEqual(sorted(sent), sorted(set(texts)))
+        self.assertEqual(len(self.prompts), 2)
+
+    def test_empty_batch_is_rejected(self):
+        response = self.client.post("/feedback/insights/batch", json={"texts": []})
+        self.assertEqual(response.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""Feedback history: summary-only pages, per-user scoping and the full detail view.
+
+Run from server/: python -m unittest discover -s tests
+"""
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# Point settings at throwaway locations before anything reads them
+os.environ.setdefault("HUGGINGFACE_CACHE_DIR", tempfile.mkdtemp())
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from main import app  # noqa: E402
+from schemas import FeedbackSummary  # noqa: E402
+from services import huggingface_service as hf  # noqa: E402
+
+
+async def _fake_call(prompt, max_retries=3, max_length=512):
+    if "JSON format" in prompt:
+        content = json.dumps({"themes": [{"name": "Speed"}], "anomalies": [], "summary": "stub summary"})
+    else:
+        content = "**User Story:**\nAs a user, I want a stub story."
+    return {"content": content, "model": "stub-model"}
+
+
+class FeedbackHistoryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Startup validation would reach the network from a worker thread
+        with mock.patch.object(hf, "validate_huggingface_key", return_value=False), \
+                mock.patch.object(hf, "warm_up_semantic_cache", return_value=False):
+            cls.client = TestClient(app)
+            cls.client.__enter__()
+        cls.owner = cls._login("history_owner")
+        cls.other = cls._login("history_other")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.client.__exit__(None, None, None)
+
+    @classmethod
+    def _login(cls, username):
+        credentials = {"username": username, "password": "s3cret-pass"}
+        cls.client.post("/auth/signup", json={**credentials, "email": f"{username}@example.com"})
+        token = cls.client.post("/auth/login", json=credentials).json()["access_token"]
+        return {"Authorization": f"Bearer {token}"}
+
+    def setUp(self):
+        for target, value in (("call_huggingface_async", _fake_call), ("_AVAILABLE", True)):
+            patcher = mock.patch.object(hf, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _submit(self, text, headers):
+        response = self.client.post("/feedback/submit", json={"text": text}, headers=headers)
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_history_lists_summaries_only(self):
+        submitted = self._submit("history summary check", self.owner)
+
+        history = self.client.get("/feedback/history", headers=self.owner).json()
+
+        item = next(entry for entry in history if entry["id"] == submitted["id"])
+        self.assertEqual(set(item), set(FeedbackSummary.model_fields))
+        self.assertEqual(item["text"], "history summary check")
+        self.assertEqual(item["sentiment_label"], submitted["sentiment_label"])
+
+    def test_detail_returns_story_insights_and_provenance(self):
+        submitted = self._submit("history detail check", self.owner)
+
+        detail = self.client.get(f"/feedback/{submitted['id']}", headers=self.owner).json()
+
+        self.assertIn("stub story", detail["user_story"])
+        self.assertEqual(detail["insights"]["summary"], "stub summary")
+        self.assertEqual(detail["story_source"], "huggingface")
+        self.assertEqual(detail["insights_model"], "stub-model")
+
+    def test_history_pages_with_skip_and_limit(self):
+        for i in range(3):
+            self._submit(f"history page check {i}", self.owner)
+        everything = self.client.get("/feedback/history", headers=self.owner).json()
+
+        first = self.client.get("/feedback/history?limit=2", headers=self.owner).json()
+        rest = self.client.get("/feedback/history?skip=2", headers=self.owner).json()
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual([e["id"] for e in first + rest], [e["id"] for e in everything])
+
+    def test_history_limit_is_bounded(self):
+        response = self.client.get("/feedback/history?limit=100000", headers=self.owner)
+        self.assertEqual(response.status_code, 422)
+
+    def test_entries_are_scoped_to_their_owner(self):
+        submitted = self._submit("history private check", self.owner)
+
+        other_ids = [e["id"] for e in self.client.get("/feedback/history", headers=self.other).json()]
+        self.assertNotIn(submitted["id"], other_ids)
+        self.assertEqual(self.client.get(f"/feedback/{submitted['id']}", headers=self.other).status_code, 404)
+        self.assertEqual(self.client.delete(f"/feedback/{submitted['id']}", headers=self.other).status_code, 404)
+        self.assertEqual(self.client.delete(f"/feedback/{submitted['id']}", headers=self.owner).status_code, 204)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+"""Schema migrations applied to a database created by the pre-migration code.
+
+Run from server/: python -m unittest discover -s tests
+"""
+import importlib
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# Point settings at throwaway locations before anything reads them
+os.environ.setdefault("HUGGINGFACE_CACHE_DIR", tempfile.mkdtemp())
+os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/test.db"
+
+from sqlalchemy import create_engine, inspect, text  # noqa: E402
+from sqlalchemy.ext.asyncio import create_async_engine  # noqa: E402
+
+import database  # noqa: E402
+import migrations  # noqa: E402
+import models  # noqa: E402,F401  registers tables on Base.metadata
+
+# Tables as the baseline models created them, before schema_meta existed
+BASELINE_SCHEMA = (
+    "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR UNIQUE, username VARCHAR UNIQUE, "
+    "hashed_password VARCHAR, created_at DATETIME)",
+    "CREATE TABLE feedback_entries (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users (id), "
+    "text TEXT NOT NULL, sentiment FLOAT, sentiment_label VARCHAR, user_story TEXT, "
+    "story_metadata TEXT, insights TEXT, created_at DATETIME)",
+)
+
+
+class MigrationTest(unittest.TestCase):
+    def setUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "baseline.db")
+        self.engine = create_engine(f"sqlite:///{self.path}")
+        self.addCleanup(self.engine.dispose)
+
+    def _create_baseline(self, drop_story_metadata=False):
+        with self.engine.begin() as conn:
+            for statement in BASELINE_SCHEMA:
+                if drop_story_metadata:
+                    statement = statement.replace("story_metadata TEXT, ", "")
+                conn.execute(text(statement))
+            conn.execute(text("INSERT INTO users (id, email, username) VALUES (1, 'a@example.com', 'a')"))
+
+    def _insert(self, conn, entry_id, story_metadata=None, insights=None):
+        conn.execute(
+            text(
+                "INSERT INTO feedback_entries (id, user_id, text, story_metadata, insights) "
+                "VALUES (:id, 1, 'feedback', :story_metadata, :insights)"
+            ),
+            {"id": entry_id, "story_metadata": story_metadata, "insights": insights},
+        )
+
+    def _migrate(self):
+        with self.engine.begin() as conn:
+            return migrations.run_migrations(conn)
+
+    def _columns(self):
+        return {column["name"] for column in inspect(self.engine).get_columns("feedback_entries")}
+
+    def test_fresh_database_reports_version_zero(self):
+        with self.engine.connect() as conn:
+            self.assertEqual(migrations.get_schema_version(conn), 0)
+
+    def test_baseline_database_is_migrated_and_stamped(self):
+        self._create_baseline()
+
+        self.assertEqual(self._migrate(), migrations.SCHEMA_VERSION)
+
+        with self.engine.connect() as conn:
+            self.assertEqual(migrations.get_schema_version(conn), migrations.SCHEMA_VERSION)
+        source_columns = importlib.import_module("migrations.0003_feedback_source_columns").SOURCE_COLUMNS
+        self.assertLessEqual(set(source_columns), self._columns())
+        indexes = {index["name"] for index in inspect(self.engine).get_indexes("feedback_entries")}
+        self.assertIn("ix_feedback_user_created", indexes)
+
+    def test_story_metadata_column_is_added_to_older_databases(self):
+        self._create_baseline(drop_story_metadata=True)
+        self.assertNotIn("story_metadata", self._columns())
+
+        self._migrate()
+
+        self.assertIn("story_metadata", self._columns())
+
+    def test_source_columns_are_backfilled_from_json(self):
+        self._create_baseline()
+        with self.engine.begin() as conn:
+            self._insert(
+                conn, 1,
+                story_metadata=json.dumps({"source": "huggingface", "model": "m1"}),
+                insights=json.dumps({"source": "fallback", "reason": "timeout"}),
+            )
+            self._insert(conn, 2, story_metadata="not json", insights=json.dumps(["a", "list"]))
+            self._insert(conn, 3)
+
+        self._migrate()
+
+        with self.engine.connect() as conn:
+            rows = {
+                row.id: row for row in conn.execute(text(
+                    "SELECT id, story_source, story_model, story_reason, "
+                    "insights_source, insights_model, insights_reason FROM feedback_entries"
+                ))
+            }
+        self.assertEqual(
+            tuple(rows[1])[1:], ("huggingface", "m1", None, "fallback", None, "timeout")
+        )
+        self.assertEqual(tuple(rows[2])[1:], (None,) * 6)
+        self.assertEqual(tuple(rows[3])[1:], (None,) * 6)
+
+    def test_rerun_is_a_no_op(self):
+        self._create_baseline()
+        self._migrate()
+        with self.engine.begin() as conn:
+            self._insert(conn, 1, story_metadata=json.dumps({"source": "huggingface"}))
+
+        self.assertEqual(self._migrate(), migrations.SCHEMA_VERSION)
+
+        # 0003 already ran, so the new row is not backfilled a second time
+        with self.engine.connect() as conn:
+            self.assertIsNone(conn.execute(text("SELECT story_source FROM feedback_entries")).scalar())
+
+
+class CheckSchemaVersionTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.path = os.path.join(tempfile.mkdtemp(), "check.db")
+        self.engine = create_async_engine(f"sqlite+aiosqlite:///{self.path}")
+        patcher = mock.patch.object(database, "engine", self.engine)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def asyncTearDown(self):
+        await self.engine.dispose()
+
+    async def test_unmigrated_database_is_rejected(self):
+        with self.assertRaisesRegex(RuntimeError, "python -m migrations"):
+            await database.check_schema_version()
+
+    async def test_migrated_database_passes(self):
+        async with self.engine.begin() as conn:
+            await conn.run_sync(database.Base.metadata.create_all)
+            await conn.run_sync(migrations.run_migrations)
+
+        await database.check_schema_version()
+
+
+if __name__ == "__main__":
+    unittest.main()
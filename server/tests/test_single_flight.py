@@ -0,0 +1,58 @@
+"""Single-flight generation: concurrent callers for one text share a model call.
+
+Run from server/: python -m unittest discover -s tests
+"""
+import asyncio
+import os
+import tempfile
+import unittest
+
+# Keep the disk result cache out of server/.cache before the service reads settings
+os.environ.setdefault("HUGGINGFACE_CACHE_DIR", tempfile.mkdtemp())
+
+from services import huggingface_service as hf  # noqa: E402
+
+
+class CachedGenerationTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.calls = 0
+        self.cache = hf._ResultCache("test-flight", 8)
+
+    async def _generate(self, feedback_text):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"story": "ok", "source": "huggingface", "model": "m"}
+
+    async def test_failed_cache_write_still_resolves_followers(self):
+        def broken_put(feedback_text, value):
+            raise RuntimeError("embedder blew up")
+        self.cache.put = broken_put
+
+        results = await asyncio.wait_for(asyncio.gather(
+            hf._cached_generation_async(self.cache, self._generate, "same text"),
+            hf._cached_generation_async(self.cache, self._generate, "same text"),
+        ), timeout=5)
+
+        self.assertEqual([r["story"] for r in results], ["ok", "ok"])
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(hf._inflight, {})
+
+    async def test_leader_error_reaches_followers(self):
+        async def failing(feedback_text):
+            self.calls += 1
+            await asyncio.sleep(0.05)
+            raise RuntimeError("boom")
+
+        results = await asyncio.wait_for(asyncio.gather(
+            hf._cached_generation_async(self.cache, failing, "bad text"),
+            hf._cached_generation_async(self.cache, failing, "bad text"),
+            return_exceptions=True,
+        ), timeout=5)
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(hf._inflight, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,15 @@
+import re
+
+# Lower-cased values that mean "no real key configured"
+_PLACEHOLDERS = frozenset({"", "placeholder", "your_huggingface_api_key_here"})
+_PLACEHOLDER_RE = re.compile(r"^your_", re.IGNORECASE)
+MIN_KEY_LENGTH = 10
+
+
+def is_placeholder_key(key: str) -> bool:
+    """Return True if an API key is missing, too short, or a template placeholder."""
+    return (
+        key.lower() in _PLACEHOLDERS
+        or len(key) < MIN_KEY_LENGTH
+        or _PLACEHOLDER_RE.match(key) is not None
+    )